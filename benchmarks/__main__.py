@@ -0,0 +1,54 @@
+"""Run every benchmark, record the results and compare with the last run.
+
+Run from the repository root:
+
+    python -m benchmarks                 # everything, appended to results.jsonl
+    python -m benchmarks status entities # just those, not recorded
+"""
+import argparse
+
+from . import (
+    bench_entities,
+    bench_login_parser,
+    bench_refresh,
+    bench_schedule,
+    bench_simulated_week,
+    bench_status,
+)
+from .common import RESULTS, last_run, record, report
+
+SUITES = {
+    "login": bench_login_parser,
+    "schedule": bench_schedule,
+    "status": bench_status,
+    "refresh": bench_refresh,
+    "entities": bench_entities,
+    "week": bench_simulated_week,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("suites", nargs="*", metavar="suite", help=", ".join(SUITES))
+    parser.add_argument(
+        "--no-record", action="store_true", help=f"don't append to {RESULTS.name}"
+    )
+    args = parser.parse_args()
+    for name in args.suites:
+        if name not in SUITES:
+            parser.error(f"unknown suite {name}, expected one of {', '.join(SUITES)}")
+
+    results = {}
+    for name in args.suites or SUITES:
+        results.update(SUITES[name].run())
+
+    # Only a full run is worth keeping for comparison
+    if args.suites or args.no_record:
+        previous = last_run()
+    else:
+        previous = record(results)
+    report(results, previous)
+
+
+if __name__ == "__main__":
+    main()
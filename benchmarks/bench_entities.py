@@ -0,0 +1,72 @@
+"""Time the entity properties Home Assistant reads on every state write.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_entities
+"""
+import json
+import logging
+import random
+from types import SimpleNamespace
+
+from custom_components.climote.climate import ClimoteEntity
+from custom_components.climote.climote_service import ClimoteService
+from custom_components.climote.sensor import BoostRemaining
+from custom_components.climote.status import parse_status
+
+from .common import measure, report
+from .fake_cloud import FakeClimoteCloud
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _hub(zones):
+    """A service holding a status with zones zones, some of them boosting"""
+    cloud = FakeClimoteCloud(zones=zones, seed=0)
+    hub = cloud.hub_state[cloud.passcodes[0]]
+    for zone in list(hub.zones.values())[::2]:
+        zone.boost_until = 3600
+    svc = ClimoteService(
+        hub.passcode,
+        "user@example.com",
+        "password",
+        _LOGGER,
+        refresh_interval=12,
+        default_boost_duration="0.5",
+    )
+    svc.status = parse_status(json.loads(json.dumps(hub.report(0, random.Random(0)))))
+    return SimpleNamespace(climote=svc)
+
+
+def run(number=2000):
+    results = {}
+    for zones in (3, 24):
+        coordinator = _hub(zones)
+        climate = [
+            ClimoteEntity(coordinator, z, f"zone{z}") for z in range(1, zones + 1)
+        ]
+        sensors = [
+            BoostRemaining(coordinator, z, f"zone{z}") for z in range(1, zones + 1)
+        ]
+
+        def read_climate():
+            for entity in climate:
+                entity.current_temperature
+                entity.target_temperature
+                entity.hvac_mode
+                entity.hvac_action
+
+        def read_sensors():
+            for entity in sensors:
+                entity._update_measurement()
+                entity.native_value
+
+        results[f"entities.climate[{zones} zones]"] = measure(read_climate, number)
+        results[f"entities.boost_remaining[{zones} zones]"] = measure(
+            read_sensors, number
+        )
+    return results
+
+
+if __name__ == "__main__":
+    report(run())
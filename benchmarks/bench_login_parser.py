@@ -0,0 +1,57 @@
+"""Compare login page token extraction against the old BeautifulSoup parse.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_login_parser
+"""
+from bs4 import BeautifulSoup
+
+from custom_components.climote.login_parser import parse_login_page
+
+from .common import FIXTURES, measure
+
+_SCHEDULE_ELEMENT = "/manager/edit-heating-schedule?heatingScheduleId"
+
+
+def legacy_parse(text):
+    """What __login did before login_parser existed"""
+    soup = BeautifulSoup(text, "lxml")
+    input = soup.find("input")
+    token = input["value"]
+    config_id = None
+    sched = text.find(_SCHEDULE_ELEMENT)
+    if sched:
+        cut = text.find("&startday", sched)
+        config_id = text[sched : -(len(text) - cut)][49:]
+    return token, config_id
+
+
+def run(number=500):
+    results = {}
+    for path in sorted(FIXTURES.glob("login_page*.html")):
+        text = path.read_text()
+        assert parse_login_page(text) == legacy_parse(text), path.name
+        results[f"login.parse[{path.stem}]"] = measure(
+            lambda: parse_login_page(text), number
+        )
+    return results
+
+
+def main(number=500):
+    for path in sorted(FIXTURES.glob("login_page*.html")):
+        text = path.read_text()
+        assert parse_login_page(text) == legacy_parse(text), path.name
+        print(f"{path.name} ({len(text)} bytes)")
+        for name, func in (
+            ("beautifulsoup", legacy_parse),
+            ("login_parser", parse_login_page),
+        ):
+            result = measure(lambda: func(text), number)
+            print(
+                f"  {name:<14} {result['seconds'] * 1e6:10.1f} us/call "
+                f"{result['peak_bytes'] / 1024:10.1f} KiB peak"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Time a whole forced refresh against the fake cloud.
+
+Logs in, loads the schedule, then repeats updateStatus(True): the forced
+get-status, the waiting-get-status-response polls and the decode. The
+fake hub answers instantly, so what is left is the client's own cost
+plus local HTTP.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_refresh
+"""
+import asyncio
+import logging
+
+import aiohttp
+
+from custom_components.climote import climote_service
+
+from .common import measure_async, report
+from .fake_cloud import FakeClimoteCloud, point_service_at
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def _run(number):
+    results = {}
+    async with FakeClimoteCloud(zones=3, sms_latency=(0, 0)) as cloud:
+        point_service_at(cloud.base_url)
+        async with aiohttp.ClientSession() as session:
+            svc = climote_service.ClimoteService(
+                cloud.passcodes[0],
+                "user@example.com",
+                "password",
+                _LOGGER,
+                refresh_interval=12,
+                default_boost_duration="0.5",
+                session=session,
+            )
+            # Measure the client, not how long the limiter makes it wait
+            svc.rate_limiters = []
+            svc.poll_strategy.initial = 0
+            assert await svc.initialize()
+
+            results["refresh.initialize"] = await measure_async(svc.initialize, 10)
+            results["refresh.forced"] = await measure_async(
+                lambda: svc.updateStatus(True), number
+            )
+            results["refresh.cloud"] = await measure_async(svc.getStatus, number)
+            await svc.close()
+    return results
+
+
+def run(number=200):
+    return asyncio.run(_run(number))
+
+
+if __name__ == "__main__":
+    report(run())
@@ -0,0 +1,26 @@
+"""Time parsing the get-heating-schedule XML and finding the active zones.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_schedule
+"""
+from custom_components.climote.schedule import parse_schedule
+
+from .common import measure, report
+from .fake_cloud import FakeClimoteCloud, schedule_xml
+
+
+def run(number=500):
+    results = {}
+    for zones in (3, 8):
+        hub = FakeClimoteCloud(zones=zones).hub_state["1000000"]
+        content = schedule_xml(hub).encode()
+        assert len(parse_schedule(content).active_zones()) == zones
+        results[f"schedule.parse[{zones} zones]"] = measure(
+            lambda: parse_schedule(content).active_zones(), number
+        )
+    return results
+
+
+if __name__ == "__main__":
+    report(run())
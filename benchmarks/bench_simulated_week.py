@@ -0,0 +1,130 @@
+"""Time a simulated week of one hub on a SimulatedClock.
+
+The test mode service replays the recorded cloud at recorded speed, but
+on simulated time. Every five minutes it does what the coordinator does
+with default settings: a forced refresh when ClimoteService says one is
+due, a cloud read otherwise. Each evening a zone is boosted for an hour
+and its boost sensor told about every refresh, counting down between
+them. Rate limiting, command debouncing, idle logouts, SMS polling and
+the countdown all wait on the same clock, so the week costs only the
+client's own work. tests/test_simulated_week.py checks what it did.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_simulated_week
+"""
+import asyncio
+from dataclasses import dataclass, field
+import datetime
+import logging
+from types import SimpleNamespace
+
+from custom_components.climote.climote_service_stub import ClimoteService
+from custom_components.climote.clock import SimulatedClock
+from custom_components.climote.sensor import BoostRemaining
+
+from .common import measure_async, report
+
+_LOGGER = logging.getLogger(__name__)
+
+WEEK = 7 * 24 * 60 * 60
+# The coordinator's defaults, in seconds
+CLOUD_INTERVAL = 5 * 60
+REFRESH_HOURS = 12
+BOOST_AT = datetime.time(18)
+
+
+@dataclass
+class Week:
+    """What happened, by the simulated clock"""
+
+    forced: list = field(default_factory=list)
+    cloud: int = 0
+    failed: int = 0
+    boosts: list = field(default_factory=list)
+    # (time, minutes) for every state the boost sensor wrote
+    countdown: list = field(default_factory=list)
+
+    def summary(self):
+        return {
+            "forced": len(self.forced),
+            "cloud": self.cloud,
+            "failed": self.failed,
+            "boosts": len(self.boosts),
+            "boost_writes": sum(value is not None for _, value in self.countdown),
+        }
+
+
+async def _follow_schedule(svc, clock, sensor, week, boost_at):
+    zone_id = next(iter(svc.zones))
+    boosted_on = None
+    while True:
+        due = svc.forced_refresh_due()
+        ok = await (svc.updateStatus(True) if due else svc.getStatus())
+        if due:
+            week.forced.append(svc.last_update_attempt)
+        else:
+            week.cloud += 1
+        week.failed += not ok
+
+        now = clock.now()
+        if boost_at and now.time() >= boost_at and boosted_on != now.date():
+            boosted_on = now.date()
+            await svc.boost(zone_id)
+            week.boosts.append(now)
+        sensor._handle_coordinator_update()
+        await clock.sleep(CLOUD_INTERVAL)
+
+
+async def simulate_week(refresh_hours=REFRESH_HOURS, boost_at=BOOST_AT, **kwargs):
+    """Run a week, boosting each day at boost_at unless it's None
+
+    kwargs go to ClimoteService, for the refresh schedule's settings say.
+    """
+    clock = SimulatedClock()
+    svc = ClimoteService(
+        "1234567",
+        "user@example.com",
+        "password",
+        _LOGGER,
+        refresh_interval=refresh_hours,
+        default_boost_duration="1.0",
+        clock=clock,
+        **kwargs,
+    )
+    week = Week()
+    initialized = asyncio.get_running_loop().create_task(svc.initialize())
+    await clock.advance(60)
+    assert initialized.result()
+    sensor = BoostRemaining(
+        SimpleNamespace(climote=svc), next(iter(svc.zones)), "simulated"
+    )
+    # Not added to Home Assistant, keep what it would have been told
+    sensor.async_write_ha_state = lambda: week.countdown.append(
+        (clock.now(), sensor.native_value)
+    )
+    schedule = asyncio.get_running_loop().create_task(
+        _follow_schedule(svc, clock, sensor, week, boost_at)
+    )
+    await clock.advance(WEEK)
+    schedule.cancel()
+    closing = asyncio.get_running_loop().create_task(svc.close())
+    await clock.advance(60)
+    await closing
+    return week
+
+
+async def _run(number):
+    week = await simulate_week()
+    _LOGGER.info("Simulated week: %s", week.summary())
+    return {"simulated.week": await measure_async(simulate_week, number)}
+
+
+def run(number=3):
+    return asyncio.run(_run(number))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("custom_components").setLevel(logging.WARNING)
+    report(run())
@@ -0,0 +1,34 @@
+"""Time decoding the status JSON a refresh returns.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_status
+"""
+import json
+import random
+
+from custom_components.climote.status import parse_status
+
+from .common import measure, report
+from .fake_cloud import FakeClimoteCloud
+
+
+def run(number=5000):
+    results = {}
+    for zones in (3, 8):
+        hub = FakeClimoteCloud(zones=zones).hub_state["1000000"]
+        text = json.dumps(hub.report(0, random.Random(0)))
+        status = parse_status(json.loads(text))
+        assert len(status.zones) == zones
+        results[f"status.decode[{zones} zones]"] = measure(
+            lambda: parse_status(json.loads(text)), number
+        )
+        results[f"status.zone[{zones} zones]"] = measure(
+            lambda: [status.zone(z).temperature for z in range(1, zones + 1)],
+            number,
+        )
+    return results
+
+
+if __name__ == "__main__":
+    report(run())
@@ -0,0 +1,89 @@
+"""Timing and result history shared by the benchmarks."""
+import datetime
+import json
+from pathlib import Path
+import platform
+import subprocess
+import time
+import timeit
+import tracemalloc
+
+FIXTURES = Path(__file__).parent / "fixtures"
+RESULTS = Path(__file__).parent / "results.jsonl"
+
+
+def measure(func, number):
+    """Mean seconds per call of func() and the peak memory of one call"""
+    seconds = timeit.timeit(func, number=number) / number
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": seconds, "peak_bytes": peak}
+
+
+async def measure_async(func, number):
+    """Mean wall and CPU seconds per await of func()
+
+    CPU time is what the event loop actually spent on it, wall time also
+    includes waiting on the network and any sleeps.
+    """
+    wall, cpu = time.perf_counter(), time.process_time()
+    for _ in range(number):
+        await func()
+    return {
+        "seconds": (time.perf_counter() - wall) / number,
+        "cpu_seconds": (time.process_time() - cpu) / number,
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def record(results, path=RESULTS):
+    """Append a run to the history, returning the run before it"""
+    previous = last_run(path)
+    run = {
+        "when": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with path.open("a") as history:
+        history.write(json.dumps(run) + "\n")
+    return previous
+
+
+def last_run(path=RESULTS):
+    if not path.exists():
+        return None
+    lines = path.read_text().splitlines()
+    return json.loads(lines[-1]) if lines else None
+
+
+def report(results, previous=None):
+    """Print each result, with the change since the previous run if there was one"""
+    before = previous["results"] if previous else {}
+    if previous:
+        print(f"Compared with {previous['commit']} from {previous['when']}")
+    for name, result in results.items():
+        line = f"  {name:<40} {result['seconds'] * 1e6:12.1f} us"
+        if "cpu_seconds" in result:
+            line += f" {result['cpu_seconds'] * 1e6:10.1f} us cpu"
+        if "peak_bytes" in result:
+            line += f" {result['peak_bytes'] / 1024:8.1f} KiB peak"
+        if name in before and before[name]["seconds"]:
+            change = result["seconds"] / before[name]["seconds"] - 1
+            line += f" {change:+8.1%}"
+        print(line)
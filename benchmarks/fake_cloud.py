@@ -0,0 +1,432 @@
+"""A local stand-in for climote.climote.ie, for benchmarks and load tests.
+
+Serves the same endpoints ClimoteService calls, with pages, JSON and XML
+shaped like the real ones. Forced status requests answer after a random
+"SMS" delay, and errors or stalls can be injected at a given rate.
+
+Run it on its own from the repository root:
+
+    python -m benchmarks.fake_cloud --hubs 20 --zones 3 --sms-latency 5 15
+
+or start it inside a test with FakeClimoteCloud(...).start(). Either way
+point_service_at() sends ClimoteService to it instead of the real cloud.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter
+from dataclasses import dataclass, field
+import datetime
+import html
+import random
+import secrets
+import time
+
+from aiohttp import web
+
+BASE_PASSCODE = 1000000
+BASE_SCHEDULE_ID = 100000
+COOKIE = "PHPSESSID"
+ZONE_LABELS = ("Living", "Bedrooms", "Water", "Kitchen", "Office", "Garage")
+COMMAND_ACCEPTED = "ok"
+
+
+@dataclass
+class FakeZone:
+    zone_id: int
+    label: str
+    active: bool = True
+    thermostat: int = 20
+    temperature: float = 18.0
+    boost_until: float | None = None
+
+    def status(self, now, rng):
+        remaining = None
+        if self.boost_until is not None:
+            remaining = max(0, round((self.boost_until - now) / 60))
+            if not remaining:
+                self.boost_until = None
+        heating = remaining is not None
+        # Drift towards the thermostat while heating, away from it when not
+        self.temperature += rng.uniform(0, 0.5) if heating else -rng.uniform(0, 0.2)
+        return {
+            "burner": int(heating and self.temperature < self.thermostat),
+            "status": "5" if heating else None,
+            "temperature": str(round(self.temperature)) if self.active else "--",
+            "thermostat": self.thermostat,
+            "timeRemaining": remaining or 0,
+        }
+
+
+@dataclass
+class FakeHub:
+    passcode: str
+    schedule_id: str
+    zones: dict[int, FakeZone]
+    # Minutes the hub clock runs ahead of the cloud's
+    clock_skew: float = 0
+    # What the cloud last heard from the hub, and when a forced request answers
+    reported: dict | None = None
+    answer_at: float | None = None
+
+    def report(self, now, rng):
+        cloud = datetime.datetime.now()
+        unit = cloud + datetime.timedelta(minutes=self.clock_skew)
+        data = {
+            "holiday": "00",
+            "hold": None,
+            "updated_at": cloud.strftime("%H:%M"),
+            "unit_time": unit.strftime("%H:%M"),
+        }
+        for zone in self.zones.values():
+            data[f"zone{zone.zone_id}"] = zone.status(now, rng)
+        return data
+
+
+@dataclass
+class Session:
+    passcode: str
+    token: str
+    started: float
+
+
+@dataclass
+class FakeClimoteCloud:
+    """The cloud and every hub behind it.
+
+    sms_latency is the (min, max) seconds a hub takes to answer a forced
+    status request, request_latency the same for every HTTP request.
+    error_rate is the share of requests answered with a 500, stall_rate
+    the share held for stall seconds before answering. Sessions older
+    than session_ttl seconds get the login form back, the way the real
+    cloud shows an expired session.
+    """
+
+    hubs: int = 1
+    zones: int = 3
+    active_zones: int | None = None
+    sms_latency: tuple[float, float] = (5.0, 15.0)
+    request_latency: tuple[float, float] = (0.0, 0.0)
+    error_rate: float = 0.0
+    stall_rate: float = 0.0
+    stall: float = 60.0
+    session_ttl: float | None = None
+    clock_skew: float = 0
+    host: str = "127.0.0.1"
+    port: int = 0
+    seed: int | None = None
+    calls: Counter = field(default_factory=Counter)
+    errors: Counter = field(default_factory=Counter)
+
+    def __post_init__(self):
+        self._random = random.Random(self.seed)
+        active = self.zones if self.active_zones is None else self.active_zones
+        self.hub_state = {}
+        for i in range(self.hubs):
+            passcode = str(BASE_PASSCODE + i)
+            self.hub_state[passcode] = FakeHub(
+                passcode=passcode,
+                schedule_id=str(BASE_SCHEDULE_ID + i),
+                zones={
+                    z: FakeZone(z, ZONE_LABELS[(z - 1) % len(ZONE_LABELS)], z <= active)
+                    for z in range(1, self.zones + 1)
+                },
+                clock_skew=self.clock_skew,
+            )
+        self.sessions = {}
+        self._runner = None
+
+    @property
+    def passcodes(self):
+        return list(self.hub_state)
+
+    @property
+    def base_url(self):
+        # aiohttp's default cookie jar ignores cookies from IP addresses
+        host = "localhost" if self.host == "127.0.0.1" else self.host
+        return f"http://{host}:{self.port}"
+
+    def app(self):
+        app = web.Application(middlewares=[self._faults])
+        app.router.add_post("/manager/login", self.login)
+        app.router.add_get("/manager/logout", self.logout)
+        app.router.add_route("*", "/manager/get-status", self.get_status)
+        app.router.add_post(
+            "/manager/waiting-get-status-response", self.waiting_get_status_response
+        )
+        app.router.add_post("/manager/boost", self.boost)
+        app.router.add_post("/manager/temperature", self.temperature)
+        app.router.add_get("/manager/get-heating-schedule", self.get_heating_schedule)
+        return app
+
+    async def start(self):
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    @web.middleware
+    async def _faults(self, request, handler):
+        name = request.path.rsplit("/", 1)[-1]
+        self.calls[name] += 1
+        roll = self._random.random()
+        if roll < self.error_rate:
+            self.errors[name] += 1
+            raise web.HTTPInternalServerError(text="Internal Server Error")
+        if roll < self.error_rate + self.stall_rate:
+            self.errors[name] += 1
+            await asyncio.sleep(self.stall)
+        elif self.request_latency[1]:
+            await asyncio.sleep(self._random.uniform(*self.request_latency))
+        return await handler(request)
+
+    def _session(self, request):
+        session = self.sessions.get(request.cookies.get(COOKIE))
+        if session is None:
+            return None
+        if self.session_ttl is not None and (
+            time.monotonic() - session.started > self.session_ttl
+        ):
+            del self.sessions[request.cookies[COOKIE]]
+            return None
+        return session
+
+    async def _hub(self, request, check_token=False):
+        """The logged in hub, or None if the login form should be shown"""
+        session = self._session(request)
+        if session is None:
+            return None
+        if check_token:
+            form = await request.post()
+            if form.get("cs_token_rf") != session.token:
+                return None
+        return self.hub_state[session.passcode]
+
+    async def login(self, request):
+        form = await request.post()
+        # ClimoteService sends the passcode in the username field
+        hub = self.hub_state.get(form.get("username"))
+        if hub is None:
+            return web.Response(text=login_form_page(), content_type="text/html")
+        cookie = secrets.token_hex(16)
+        session = Session(hub.passcode, secrets.token_hex(16), time.monotonic())
+        self.sessions[cookie] = session
+        response = web.Response(
+            text=manager_page(hub, session.token), content_type="text/html"
+        )
+        response.set_cookie(COOKIE, cookie)
+        return response
+
+    async def logout(self, request):
+        self.sessions.pop(request.cookies.get(COOKIE), None)
+        return web.Response(text=login_form_page(), content_type="text/html")
+
+    async def get_status(self, request):
+        hub = await self._hub(request)
+        if hub is None:
+            return web.Response(text=login_form_page(), content_type="text/html")
+        if request.query.get("force") == "1":
+            # Texts the hub, which answers some time later
+            hub.answer_at = time.monotonic() + self._random.uniform(*self.sms_latency)
+            return web.Response(text="1")
+        if hub.reported is None:
+            return web.Response(text="0")
+        return web.json_response(hub.reported)
+
+    async def waiting_get_status_response(self, request):
+        hub = await self._hub(request)
+        if hub is None:
+            return web.Response(text=login_form_page(), content_type="text/html")
+        now = time.monotonic()
+        if hub.answer_at is None or now < hub.answer_at:
+            return web.Response(text="0")
+        hub.answer_at = None
+        hub.reported = hub.report(now, self._random)
+        return web.json_response(hub.reported)
+
+    async def boost(self, request):
+        hub = await self._hub(request, check_token=True)
+        if hub is None:
+            return web.Response(text=login_form_page(), content_type="text/html")
+        form = await request.post()
+        now = time.monotonic()
+        for zone_id, hours in _zone_fields(form, "zoneIds"):
+            zone = hub.zones[zone_id]
+            hours = float(hours)
+            zone.boost_until = now + hours * 3600 if hours else None
+        return web.Response(text=COMMAND_ACCEPTED)
+
+    async def temperature(self, request):
+        hub = await self._hub(request, check_token=True)
+        if hub is None:
+            return web.Response(text=login_form_page(), content_type="text/html")
+        form = await request.post()
+        for zone_id, temp in _zone_fields(form, "temp-set-input"):
+            hub.zones[zone_id].thermostat = int(temp)
+        return web.Response(text=COMMAND_ACCEPTED)
+
+    async def get_heating_schedule(self, request):
+        hub = await self._hub(request)
+        if hub is None:
+            return web.Response(text=login_form_page(), content_type="text/html")
+        if request.query.get("heatingScheduleId") != hub.schedule_id:
+            raise web.HTTPNotFound()
+        return web.Response(text=schedule_xml(hub), content_type="text/xml")
+
+
+def _zone_fields(form, name):
+    prefix = name + "["
+    for key, value in form.items():
+        if key.startswith(prefix) and key.endswith("]"):
+            yield int(key[len(prefix) : -1]), value
+
+
+def login_form_page():
+    return (
+        '<!DOCTYPE html>\n<html lang="en">\n  <head><title>Climote | Login</title></head>\n'
+        '  <body>\n    <form method="post" action="/manager/login">\n'
+        '      <input type="text" name="username">\n'
+        '      <input type="password" name="password">\n'
+        '      <input type="text" name="passcode">\n'
+        '      <button type="submit">Log in</button>\n'
+        "    </form>\n  </body>\n</html>\n"
+    )
+
+
+def manager_page(hub, token):
+    """The page the real cloud serves after login, cs_token_rf first"""
+    panels = []
+    for zone in hub.zones.values():
+        temps = "".join(
+            f'<option value="{t}">{t}&deg;C</option>' for t in range(10, 31)
+        )
+        hours = "".join(
+            f'<option value="{h}">{h} hours</option>'
+            for h in ("0.5", "1", "2", "3", "4", "5", "6", "7", "8", "9")
+        )
+        panels.append(
+            f'      <div class="zone-panel" id="zone-{zone.zone_id}">\n'
+            f'        <h3 class="zone-title">{html.escape(zone.label)}</h3>\n'
+            '        <form class="temp-form" method="post" action="/manager/temperature">\n'
+            f'          <select name="temp-set-input[{zone.zone_id}]">{temps}</select>\n'
+            '          <button type="submit" name="do" value="Set">Set</button>\n'
+            "        </form>\n"
+            '        <form class="boost-form" method="post" action="/manager/boost">\n'
+            f'          <select name="zoneIds[{zone.zone_id}]">{hours}</select>\n'
+            '          <button type="submit">Boost</button>\n'
+            "        </form>\n"
+            "      </div>\n"
+        )
+    return (
+        '<!DOCTYPE html>\n<html lang="en">\n'
+        "  <head><title>Climote | Manager</title></head>\n"
+        '  <body class="manager">\n'
+        '    <form id="csrf" method="post" action="/manager/keepalive">\n'
+        f'      <input type="hidden" name="cs_token_rf" value="{token}">\n'
+        "    </form>\n"
+        '    <div class="container">\n'
+        + "".join(panels)
+        + '      <div class="schedule">\n'
+        '        <a class="btn" href="/manager/edit-heating-schedule?heatingScheduleId='
+        f'{hub.schedule_id}&startday=1">Edit schedule</a>\n'
+        "      </div>\n    </div>\n  </body>\n</html>\n"
+    )
+
+
+def schedule_xml(hub):
+    """zoneInfo plus a weekly programme of two periods a day per zone"""
+    info = "".join(
+        f"<zone><active>{int(z.active)}</active><label>{html.escape(z.label)}</label></zone>"
+        for z in hub.zones.values()
+    )
+    day = (
+        "<day><period><start>06:30</start><end>08:30</end></period>"
+        "<period><start>17:00</start><end>22:30</end></period></day>"
+    )
+    programme = "".join(f"<zone>{day * 7}</zone>" for _ in hub.zones)
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f"<schedule><zoneInfo>{info}</zoneInfo>{programme}</schedule>"
+    )
+
+
+def point_service_at(base_url, module=None):
+    """Send every ClimoteService request to base_url instead of the real cloud"""
+    if module is None:
+        from custom_components.climote import climote_service as module
+    for name in dir(module):
+        value = getattr(module, name)
+        if name.endswith("_URL") and isinstance(value, str):
+            setattr(
+                module,
+                name,
+                value.replace("https://climote.climote.ie", base_url.rstrip("/")),
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--hubs", type=int, default=1)
+    parser.add_argument("--zones", type=int, default=3)
+    parser.add_argument("--active-zones", type=int)
+    parser.add_argument(
+        "--sms-latency",
+        type=float,
+        nargs=2,
+        default=(5.0, 15.0),
+        metavar=("MIN", "MAX"),
+    )
+    parser.add_argument(
+        "--request-latency",
+        type=float,
+        nargs=2,
+        default=(0.0, 0.0),
+        metavar=("MIN", "MAX"),
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--stall", type=float, default=60.0)
+    parser.add_argument("--session-ttl", type=float)
+    parser.add_argument("--clock-skew", type=float, default=0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    cloud = FakeClimoteCloud(
+        hubs=args.hubs,
+        zones=args.zones,
+        active_zones=args.active_zones,
+        sms_latency=tuple(args.sms_latency),
+        request_latency=tuple(args.request_latency),
+        error_rate=args.error_rate,
+        stall_rate=args.stall_rate,
+        stall=args.stall,
+        session_ttl=args.session_ttl,
+        clock_skew=args.clock_skew,
+        seed=args.seed,
+        host=args.host,
+        port=args.port,
+    )
+    print(
+        f"Fake Climote cloud on {cloud.base_url} "
+        f"passcodes {cloud.passcodes[0]}..{cloud.passcodes[-1]}"
+    )
+    web.run_app(cloud.app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
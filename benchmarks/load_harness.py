@@ -0,0 +1,315 @@
+"""Run many hubs against the fake cloud and see how the event loop copes.
+
+Each hub gets a ClimoteService on its own session over one shared
+connection pool, with the request slots and account rate limit a Home
+Assistant install would share between them. Every hub then follows the
+coordinator's schedule: a cloud read every cloud interval and a forced
+SMS refresh every refresh interval, staggered the way restored hubs are.
+After each refresh its climate and boost sensor entities are read, as
+Home Assistant would when writing their state.
+
+Intervals are in seconds so an hour of traffic can be squeezed into a
+minute. Run from the repository root:
+
+    python -m benchmarks.load_harness --hubs 50 --duration 120 \\
+        --cloud-interval 10 --refresh-interval 30 --sms-latency 5 15
+"""
+import argparse
+import asyncio
+import json
+import logging
+import resource
+import statistics
+import threading
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import aiohttp
+
+from custom_components.climote import climote_service
+from custom_components.climote.climate import ClimoteEntity
+from custom_components.climote.hub_manager import DEFAULT_MAX_CONCURRENT_REQUESTS
+from custom_components.climote.rate_limit import (
+    ACCOUNT_BURST,
+    ACCOUNT_RATE,
+    TokenBucket,
+)
+from custom_components.climote.sensor import BoostRemaining
+
+from .fake_cloud import FakeClimoteCloud, point_service_at
+
+_LOGGER = logging.getLogger(__name__)
+# Same spread as ClimoteHubManager.stagger_delay
+_SPREAD = 0.6180339887498949
+LAG_INTERVAL = 0.05
+
+
+def percentiles(values):
+    if not values:
+        return {}
+    values = sorted(values)
+    if len(values) == 1:
+        cuts = values * 99
+    else:
+        cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {
+        "count": len(values),
+        "p50": cuts[49],
+        "p90": cuts[89],
+        "p99": cuts[98],
+        "max": values[-1],
+    }
+
+
+class LoopMonitor:
+    """Samples how late the loop wakes up, plus threads and executor backlog."""
+
+    def __init__(self, interval=LAG_INTERVAL):
+        self.interval = interval
+        self.lags = []
+        self.peak_threads = threading.active_count()
+        self.peak_executor_queue = 0
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._sample())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def _sample(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, loop.time() - expected))
+            self.peak_threads = max(self.peak_threads, threading.active_count())
+            # The default executor only exists once something has used it
+            executor = getattr(loop, "_default_executor", None)
+            if executor is not None:
+                self.peak_executor_queue = max(
+                    self.peak_executor_queue, executor._work_queue.qsize()
+                )
+
+
+class Hub:
+    """One ClimoteService and the entities set up for it."""
+
+    def __init__(self, svc):
+        self.svc = svc
+        coordinator = SimpleNamespace(climote=svc)
+        self.entities = [
+            ClimoteEntity(coordinator, zone_id, label)
+            for zone_id, label in svc.zones.items()
+        ]
+        self.sensors = [
+            BoostRemaining(coordinator, zone_id, label)
+            for zone_id, label in svc.zones.items()
+        ]
+
+    def write_state(self):
+        for entity in self.entities:
+            entity.current_temperature
+            entity.target_temperature
+            entity.hvac_mode
+            entity.hvac_action
+        for sensor in self.sensors:
+            sensor._update_measurement()
+            sensor.native_value
+
+
+async def _refresh(hub, forced, latencies, failures):
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    try:
+        if forced:
+            ok = await hub.svc.updateStatus(True)
+        else:
+            ok = await hub.svc.getStatus()
+    except hub.svc.TimeoutException:
+        ok = False
+    if ok:
+        latencies.append(loop.time() - started)
+        hub.write_state()
+    else:
+        failures.append(loop.time() - started)
+
+
+async def _follow_schedule(hub, args, slot, deadline, results):
+    """What the coordinator does for one hub, until the deadline"""
+    loop = asyncio.get_running_loop()
+    await asyncio.sleep((slot * _SPREAD) % 1 * args.cloud_interval)
+    next_forced = loop.time()
+    while loop.time() < deadline:
+        forced = loop.time() >= next_forced
+        if forced:
+            next_forced = loop.time() + args.refresh_interval
+        await _refresh(
+            hub,
+            forced,
+            results["forced" if forced else "cloud"],
+            results["forced_failed" if forced else "cloud_failed"],
+        )
+        await asyncio.sleep(args.cloud_interval)
+
+
+async def run(args):
+    cloud = FakeClimoteCloud(
+        hubs=args.hubs,
+        zones=args.zones,
+        sms_latency=tuple(args.sms_latency),
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    results = {
+        "forced": [],
+        "cloud": [],
+        "forced_failed": [],
+        "cloud_failed": [],
+    }
+    async with cloud:
+        point_service_at(cloud.base_url)
+        # One pool for everyone, one cookie jar per hub, as in Home Assistant
+        connector = aiohttp.TCPConnector(limit=100)
+        request_slots = asyncio.Semaphore(args.max_concurrent)
+        accounts = [
+            TokenBucket(ACCOUNT_RATE, ACCOUNT_BURST) for _ in range(args.accounts)
+        ]
+
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        sessions = []
+        hubs = []
+        for i, passcode in enumerate(cloud.passcodes):
+            session = aiohttp.ClientSession(connector=connector, connector_owner=False)
+            sessions.append(session)
+            svc = climote_service.ClimoteService(
+                passcode,
+                f"user{i % args.accounts}@example.com",
+                "password",
+                _LOGGER,
+                refresh_interval=12,
+                default_boost_duration="0.5",
+                session=session,
+                status_timeout=args.status_timeout,
+                request_slots=request_slots,
+                account_limiter=accounts[i % args.accounts],
+            )
+            hubs.append(svc)
+
+        setup_started = time.perf_counter()
+        ready = await asyncio.gather(
+            *(svc.initialize() for svc in hubs), return_exceptions=True
+        )
+        setup = time.perf_counter() - setup_started
+        hubs = [Hub(svc) for svc, ok in zip(hubs, ready) if ok is True]
+        after, _ = tracemalloc.get_traced_memory()
+        # Tracing every allocation would slow the run itself down
+        tracemalloc.stop()
+
+        monitor = LoopMonitor()
+        monitor.start()
+        deadline = asyncio.get_running_loop().time() + args.duration
+        await asyncio.gather(
+            *(
+                _follow_schedule(hub, args, slot, deadline, results)
+                for slot, hub in enumerate(hubs)
+            )
+        )
+        await monitor.stop()
+
+        for hub in hubs:
+            await hub.svc.close()
+        for session in sessions:
+            await session.close()
+        await connector.close()
+
+    return {
+        "hubs": args.hubs,
+        "hubs_ready": len(hubs),
+        "zones": args.zones,
+        "setup_seconds": setup,
+        "loop_lag": percentiles(monitor.lags),
+        "peak_threads": monitor.peak_threads,
+        "peak_executor_queue": monitor.peak_executor_queue,
+        "memory_per_hub_kib": (after - before) / max(1, len(hubs)) / 1024,
+        "max_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "forced_refresh": percentiles(results["forced"]),
+        "cloud_refresh": percentiles(results["cloud"]),
+        "forced_failures": len(results["forced_failed"]),
+        "cloud_failures": len(results["cloud_failed"]),
+        "cloud_calls": dict(cloud.calls),
+    }
+
+
+def print_report(report):
+    print(
+        f"{report['hubs_ready']}/{report['hubs']} hubs x {report['zones']} zones, "
+        f"set up in {report['setup_seconds']:.2f}s"
+    )
+    for name in ("loop_lag", "forced_refresh", "cloud_refresh"):
+        stats = report[name]
+        if not stats:
+            print(f"  {name:<16} no samples")
+            continue
+        print(
+            f"  {name:<16} n={stats['count']:<6} p50={stats['p50'] * 1000:9.1f}ms "
+            f"p90={stats['p90'] * 1000:9.1f}ms p99={stats['p99'] * 1000:9.1f}ms "
+            f"max={stats['max'] * 1000:9.1f}ms"
+        )
+    print(
+        f"  failures         forced={report['forced_failures']} "
+        f"cloud={report['cloud_failures']}"
+    )
+    print(
+        f"  threads          peak={report['peak_threads']} "
+        f"executor queue peak={report['peak_executor_queue']}"
+    )
+    print(
+        f"  memory           {report['memory_per_hub_kib']:.1f} KiB/hub, "
+        f"max RSS {report['max_rss_mib']:.1f} MiB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--hubs", type=int, default=50)
+    parser.add_argument("--zones", type=int, default=3)
+    parser.add_argument(
+        "--accounts", type=int, help="hubs are shared between these, default one each"
+    )
+    parser.add_argument("--duration", type=float, default=60, help="seconds")
+    parser.add_argument("--cloud-interval", type=float, default=10, help="seconds")
+    parser.add_argument("--refresh-interval", type=float, default=30, help="seconds")
+    parser.add_argument("--status-timeout", type=float, default=120, help="seconds")
+    parser.add_argument(
+        "--sms-latency",
+        type=float,
+        nargs=2,
+        default=(5.0, 15.0),
+        metavar=("MIN", "MAX"),
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--max-concurrent", type=int, default=DEFAULT_MAX_CONCURRENT_REQUESTS
+    )
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--json", action="store_true", help="print the raw report")
+    args = parser.parse_args()
+    if args.accounts is None:
+        args.accounts = args.hubs
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Record a hub's cloud traffic into a replay fixture for test mode.
+
+Logs in, loads the schedule, does a forced refresh and a cloud read, and
+logs out, keeping a sanitized copy of every exchange. With --commands it
+also boosts the first zone, turns it off again and sets its thermostat
+to what it already was, so do that only on a hub you can spare.
+
+Run from the repository root:
+
+    python -m benchmarks.record_hub --passcode 1234567 \\
+        --username me@example.com --password secret \\
+        custom_components/climote/fixtures/replay.json
+
+--url records from somewhere other than the real cloud, such as the
+fake one.
+"""
+import argparse
+import asyncio
+import logging
+
+import aiohttp
+
+from custom_components.climote import climote_service
+from custom_components.climote.replay import RecordingSession
+
+from .fake_cloud import point_service_at
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def record(args):
+    if args.url:
+        point_service_at(args.url)
+    session = RecordingSession(
+        aiohttp.ClientSession(),
+        secrets=(args.passcode, args.username, args.password),
+    )
+    svc = climote_service.ClimoteService(
+        args.passcode,
+        args.username,
+        args.password,
+        _LOGGER,
+        refresh_interval=12,
+        default_boost_duration="0.5",
+        session=session,
+        command_debounce=0,
+    )
+    try:
+        if not await svc.initialize():
+            raise SystemExit("Login failed")
+        if not await svc.updateStatus(True):
+            raise SystemExit("The hub didn't answer the forced refresh")
+        await svc.getStatus()
+        if args.commands:
+            zone_id = next(iter(svc.zones))
+            thermostat = svc.status.zone(zone_id).thermostat
+            await svc.boost(zone_id)
+            await svc.off(zone_id, 0)
+            await svc.set_target_temperature(zone_id, thermostat)
+    finally:
+        await svc.close()
+        await session.close()
+    session.save(args.fixture)
+    print(
+        f"Recorded {sum(map(len, session.exchanges.values()))} exchanges "
+        f"to {args.fixture}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("fixture")
+    parser.add_argument("--passcode", required=True)
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--url", help="record from here instead of the real cloud")
+    parser.add_argument("--commands", action="store_true")
+    asyncio.run(record(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,81 @@
 """The Climate Climote integration."""
 from __future__ import annotations
 
+import asyncio
 import logging
 
+import voluptuous as vol
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
 
-from .climote_service import ClimoteService
+from .cache import ClimoteCache, async_remove_cache
+from .climote_service import (
+    DEFAULT_COMMAND_DEBOUNCE,
+    DEFAULT_CONFIRM_DELAY,
+    ClimoteService,
+)
 from .climote_service_stub import ClimoteService as ClimoteServiceStub
 from .const import (
     BOOST_DURATION,
     CLIMOTE_ID,
+    CLOUD_INTERVAL,
+    COMMAND_DEBOUNCE,
+    CONFIRM_DELAY,
+    DAILY_REFRESH_CAP,
     DOMAIN,
+    MAX_CONCURRENT_REQUESTS,
+    MAX_REFRESH_INTERVAL,
+    MIN_REFRESH_INTERVAL,
     PASSWORD,
     REFRESH_INTERVAL,
+    STATUS_TIMEOUT,
     USERNAME,
     TEST_MODE,
 )
+from .coordinator import DEFAULT_CLOUD_INTERVAL, ClimoteCoordinator
+from .hub_manager import DEFAULT_MAX_CONCURRENT_REQUESTS, async_get_hub_manager
+from .poll_strategy import DEFAULT_STATUS_TIMEOUT
+from .refresh_schedule import (
+    DEFAULT_DAILY_REFRESH_CAP,
+    DEFAULT_MAX_REFRESH_INTERVAL,
+    DEFAULT_MIN_REFRESH_INTERVAL,
+)
 
 _LOGGER = logging.getLogger(__name__)
 PLATFORMS: list[Platform] = [
+    Platform.BUTTON,
     Platform.CLIMATE,
     Platform.SELECT,
     Platform.SENSOR,
 ]
 
+# Hubs are set up through the UI, only the limits they share go in YAML
+CONFIG_SCHEMA = vol.Schema(
+    {
+        vol.Optional(DOMAIN): vol.Schema(
+            {
+                vol.Optional(
+                    MAX_CONCURRENT_REQUESTS, default=DEFAULT_MAX_CONCURRENT_REQUESTS
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+            }
+        )
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+
+async def async_setup(hass: HomeAssistant, config) -> bool:
+    """Create the hub manager with the limits from configuration.yaml."""
+    conf = config.get(DOMAIN, {})
+    async_get_hub_manager(
+        hass, conf.get(MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS)
+    )
+    return True
+
+
 # Signal Updates https://developers.home-assistant.io/docs/config_entries_options_flow_handler/#signal-updates
 async def update_listener(hass, entry):
     """Handle options update."""
@@ -36,28 +85,63 @@ async def update_listener(hass, entry):
     username = entry.data[USERNAME]
     password = entry.data[PASSWORD]
     refresh_interval = entry.data[REFRESH_INTERVAL]
+    status_timeout = entry.data.get(STATUS_TIMEOUT, DEFAULT_STATUS_TIMEOUT)
+    command_debounce = entry.data.get(COMMAND_DEBOUNCE, DEFAULT_COMMAND_DEBOUNCE)
+    confirm_delay = entry.data.get(CONFIRM_DELAY, DEFAULT_CONFIRM_DELAY)
+    min_refresh_interval = entry.data.get(
+        MIN_REFRESH_INTERVAL, DEFAULT_MIN_REFRESH_INTERVAL
+    )
+    max_refresh_interval = entry.data.get(
+        MAX_REFRESH_INTERVAL, DEFAULT_MAX_REFRESH_INTERVAL
+    )
+    daily_refresh_cap = entry.data.get(DAILY_REFRESH_CAP, DEFAULT_DAILY_REFRESH_CAP)
     test_mode = entry.data[TEST_MODE]
     if test_mode is False:
         climote = ClimoteService
     else:
         climote = ClimoteServiceStub
 
-    climote.update_instance(climoteid, username, password, refresh_interval)
+    climote.update_instance(
+        climoteid,
+        username,
+        password,
+        refresh_interval,
+        status_timeout=status_timeout,
+        command_debounce=command_debounce,
+        confirm_delay=confirm_delay,
+        min_refresh_interval=min_refresh_interval,
+        max_refresh_interval=max_refresh_interval,
+        daily_refresh_cap=daily_refresh_cap,
+    )
+    hass.data[DOMAIN][entry.entry_id].set_cloud_interval(
+        entry.data.get(CLOUD_INTERVAL, DEFAULT_CLOUD_INTERVAL)
+    )
 
 
-def get_climote_instance(entry):
+def get_climote_instance(hass, entry):
     climoteid = entry.data[CLIMOTE_ID]
 
     username = entry.data[USERNAME]
     password = entry.data[PASSWORD]
     refresh_interval = entry.data[REFRESH_INTERVAL]
     default_boost_duration = entry.data[BOOST_DURATION]
+    status_timeout = entry.data.get(STATUS_TIMEOUT, DEFAULT_STATUS_TIMEOUT)
+    command_debounce = entry.data.get(COMMAND_DEBOUNCE, DEFAULT_COMMAND_DEBOUNCE)
+    confirm_delay = entry.data.get(CONFIRM_DELAY, DEFAULT_CONFIRM_DELAY)
+    min_refresh_interval = entry.data.get(
+        MIN_REFRESH_INTERVAL, DEFAULT_MIN_REFRESH_INTERVAL
+    )
+    max_refresh_interval = entry.data.get(
+        MAX_REFRESH_INTERVAL, DEFAULT_MAX_REFRESH_INTERVAL
+    )
+    daily_refresh_cap = entry.data.get(DAILY_REFRESH_CAP, DEFAULT_DAILY_REFRESH_CAP)
     test_mode = entry.data[TEST_MODE]
     if test_mode is False:
         climote = ClimoteService
     else:
         climote = ClimoteServiceStub
 
+    hubs = async_get_hub_manager(hass)
     climote_svc = climote.get_instance(
         climoteid,
         username,
@@ -65,6 +149,16 @@ def get_climote_instance(entry):
         _LOGGER,
         refresh_interval=refresh_interval,
         default_boost_duration=default_boost_duration,
+        session=hubs.async_create_session(climoteid),
+        status_timeout=status_timeout,
+        command_debounce=command_debounce,
+        confirm_delay=confirm_delay,
+        min_refresh_interval=min_refresh_interval,
+        max_refresh_interval=max_refresh_interval,
+        daily_refresh_cap=daily_refresh_cap,
+        request_slots=hubs.request_slots,
+        account_limiter=hubs.account_limiter(username),
+        clock=hubs.clock,
     )
 
     return climote_svc
@@ -80,20 +174,50 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     entry.async_on_unload(entry.add_update_listener(update_listener))
 
     # 1. Create API instance
-    climote_svc = get_climote_instance(entry)
+    climote_svc = get_climote_instance(hass, entry)
 
-    # 2. Validate the API connection (and authentication)
-    try:
-        init_successful = await hass.async_add_executor_job(climote_svc.initialize)
-    except climote_svc.TimeoutException as ex:
-        raise ConfigEntryNotReady(ex) from ex
+    # 2. Start from the cached hub if we have one, otherwise validate the API
+    # connection (and authentication) before going any further
+    cache = ClimoteCache(hass, climote_svc)
+    restored = await cache.async_restore()
+    if not restored:
+        try:
+            init_successful = await climote_svc.initialize()
+        except climote_svc.TimeoutException as ex:
+            await _async_release(hass, climote_svc)
+            raise ConfigEntryNotReady(ex) from ex
 
-    if not init_successful:
-        raise ConfigEntryAuthFailed("Credentials were not accepted")
+        if not init_successful:
+            await _async_release(hass, climote_svc)
+            raise ConfigEntryAuthFailed("Credentials were not accepted")
+        await cache.async_save()
+
+    # 3. Store a coordinator for your platforms to access
+    # Seed it with the cached status if there is one, the first fetch happens
+    # in the background
+    coordinator = ClimoteCoordinator(
+        hass,
+        climote_svc,
+        cloud_interval=entry.data.get(CLOUD_INTERVAL, DEFAULT_CLOUD_INTERVAL),
+    )
+    if climote_svc.has_status:
+        coordinator.async_set_updated_data(climote_svc.status)
+    entry.async_on_unload(coordinator.async_add_listener(cache.async_schedule_save))
+    hass.data[DOMAIN][entry.entry_id] = coordinator
 
-    # 3. Store an API object for your platforms to access
-    # TODO consider using a coordinator rather than class and singleton directly
-    hass.data[DOMAIN][entry.entry_id] = climote_svc
+    # Hubs set up together would otherwise refresh together from then on
+    stagger = async_get_hub_manager(hass).stagger_delay(
+        climote_svc.device_id, coordinator.update_interval.total_seconds()
+    )
+    if restored:
+        first_refresh = _async_revalidate(hass, entry, coordinator, cache)
+    else:
+        first_refresh = _async_first_refresh(coordinator)
+    entry.async_create_background_task(
+        hass,
+        _async_staggered(stagger, first_refresh),
+        f"climote_first_refresh_{climote_svc.get_sanitized_device_id()}",
+    )
 
     # 4. Delegate setup to platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
@@ -101,9 +225,71 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 
+async def _async_staggered(delay, coro):
+    await asyncio.sleep(delay)
+    await coro
+
+
+async def _async_revalidate(hass, entry, coordinator, cache):
+    """Check a cached hub against the cloud once the entities are up."""
+    climote_svc = coordinator.climote
+    cached = (climote_svc.config_id, climote_svc.zones)
+    try:
+        init_successful = await climote_svc.initialize()
+    except Exception:  # pylint: disable=broad-except
+        _LOGGER.warning(
+            "Could not revalidate %s, keeping the cached zones",
+            climote_svc.get_sanitized_device_id(),
+            exc_info=True,
+        )
+        return
+
+    if not init_successful:
+        entry.async_start_reauth(hass)
+        return
+
+    await cache.async_save()
+    if (climote_svc.config_id, climote_svc.zones) != cached:
+        # The cache is only good for the heatingScheduleId it was taken from
+        _LOGGER.info("Schedule or zones changed since they were cached, reloading")
+        hass.async_create_task(hass.config_entries.async_reload(entry.entry_id))
+        return
+
+    await _async_first_refresh(coordinator)
+
+
+async def _async_first_refresh(coordinator):
+    """Get a status without holding up setup, cheaply if the cloud has one."""
+    climote_svc = coordinator.climote
+    try:
+        cloud_status = await climote_svc.getStatus()
+    except Exception:  # pylint: disable=broad-except
+        _LOGGER.debug("Cloud status unavailable", exc_info=True)
+        cloud_status = False
+
+    if cloud_status:
+        coordinator.async_set_updated_data(climote_svc.status)
+    else:
+        await coordinator.async_refresh()
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Drop the cached hub when the entry is deleted."""
+    await async_remove_cache(hass, entry.data[CLIMOTE_ID])
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_shutdown()
+        await _async_release(hass, coordinator.climote)
 
     return unload_ok
+
+
+async def _async_release(hass, climote_svc):
+    """Log out and drop the instance, a reload builds a new one on a new session."""
+    await climote_svc.close()
+    type(climote_svc).release_instance(climote_svc.device_id)
+    async_get_hub_manager(hass).async_release(climote_svc.device_id)
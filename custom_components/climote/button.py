@@ -0,0 +1,66 @@
+import logging
+from .const import DOMAIN
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers.entity import DeviceInfo, EntityCategory
+from homeassistant.components.button import ButtonEntity
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the refresh button for the hub."""
+    _LOGGER.info("Setting up climote refresh button through asyncsetupentry")
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    add_entities([RefreshButton(coordinator)])
+    return True
+
+
+class RefreshButton(CoordinatorEntity, ButtonEntity):
+    """Force the hub to report its status over SMS."""
+
+    _attr_icon = "mdi:refresh"
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, coordinator):
+        """Initialize the button."""
+        super().__init__(coordinator)
+        self._climote = coordinator.climote
+        self._name = f"climote_{self._climote.get_sanitized_device_id()}_refresh"
+        self._unique_id = f"climote_button_{self._climote.device_id}"
+
+    async def async_press(self) -> None:
+        """Ask the hub for a fresh status."""
+        await self.coordinator.async_force_refresh()
+
+    @property
+    def name(self):
+        """Return the name of the button."""
+        return self._name
+
+    @property
+    def unique_id(self):
+        """Return unique ID for this device."""
+        return self._unique_id
+
+    @property
+    def available(self) -> bool:
+        """The button is how you recover from a failed refresh."""
+        return True
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return the device info."""
+        return DeviceInfo(
+            identifiers={(DOMAIN, self._climote.device_id)},
+            name="Climote Hub",
+            manufacturer="Climote",
+            model="Remote Heating Controller",
+        )
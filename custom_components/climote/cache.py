@@ -0,0 +1,53 @@
+"""Keep each hub's schedule, zones and last status in .storage."""
+from __future__ import annotations
+
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+
+
+class ClimoteCache:
+    """Snapshot of a hub so setup doesn't have to wait for the cloud."""
+
+    def __init__(self, hass: HomeAssistant, climote_service) -> None:
+        """Initialize the cache for one hub."""
+        self._climote = climote_service
+        self._store = _store(hass, climote_service.device_id)
+
+    async def async_restore(self) -> bool:
+        """Load the snapshot into the service, returning whether there was one."""
+        cached = await self._store.async_load()
+        if not cached:
+            return False
+        _LOGGER.debug(
+            "Restoring %s from heatingScheduleId %s",
+            self._climote.get_sanitized_device_id(),
+            cached.get("config_id"),
+        )
+        return self._climote.restore(cached)
+
+    async def async_save(self) -> None:
+        """Write the snapshot now."""
+        await self._store.async_save(self._climote.snapshot())
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Write the snapshot soon, coalescing bursts of updates."""
+        self._store.async_delay_save(self._climote.snapshot, SAVE_DELAY)
+
+
+async def async_remove_cache(hass: HomeAssistant, device_id) -> None:
+    """Forget a hub that has been deleted."""
+    await _store(hass, device_id).async_remove()
+
+
+def _store(hass, device_id):
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{device_id}")
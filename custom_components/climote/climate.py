@@ -1,4 +1,3 @@
-from datetime import timedelta
 import logging
 
 from homeassistant.components.climate import (
@@ -12,20 +11,12 @@ from homeassistant.const import ATTR_TEMPERATURE, PRECISION_WHOLE, UnitOfTempera
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
 
-# TODO switch to data coordinator
-# from homeassistant.util import Throttle
-
-
 _LOGGER = logging.getLogger(__name__)
 
-# this can be passed in when using a data coordinator
-# TODO set back to 5 for now
-MIN_TIME_BETWEEN_UPDATES = timedelta(minutes=5)
-SCAN_INTERVAL = MIN_TIME_BETWEEN_UPDATES
-
 NOCHANGE = "nochange"
 ICON = "mdi:thermometer"
 
@@ -41,7 +32,8 @@ async def async_setup_entry(
         f"2. async_setup_entry UniqueID [{entry.unique_id}] Data [{entry.entry_id}]"
     )
 
-    climotesvc = hass.data[DOMAIN][entry.entry_id]
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    climotesvc = coordinator.climote
 
     entities = []
     if not climotesvc.zones:
@@ -49,7 +41,7 @@ async def async_setup_entry(
         raise Exception("There should have been zones by now")
 
     for zone_id, region in climotesvc.zones.items():
-        entities.append(ClimoteEntity(climotesvc, zone_id, region))
+        entities.append(ClimoteEntity(coordinator, zone_id, region))
     _LOGGER.info("3. Found entities %s", entities)
 
     add_entities(entities)
@@ -57,7 +49,7 @@ async def async_setup_entry(
 
 
 # flexit and adax climate.py are good examples
-class ClimoteEntity(ClimateEntity):
+class ClimoteEntity(CoordinatorEntity, ClimateEntity):
     """Representation of a Climote device."""
 
     _attr_hvac_modes = [HVACMode.HEAT, HVACMode.OFF]
@@ -67,32 +59,30 @@ class ClimoteEntity(ClimateEntity):
     _attr_target_temperature_step = PRECISION_WHOLE
     _attr_temperature_unit = UnitOfTemperature.CELSIUS
 
-    def __init__(self, climote_service, zone_id, name):
+    def __init__(self, coordinator, zone_id, name):
         """Initialize the thermostat."""
+        super().__init__(coordinator)
         _LOGGER.info(
             "Initialize Climote Entity %s -  %s - %s"
-            % (climote_service.device_id, zone_id, name)
+            % (coordinator.climote.device_id, zone_id, name)
         )
-        self._climote = climote_service
+        self._climote = coordinator.climote
         self._zoneid = zone_id
         self._name = f"climote_{self._climote.get_sanitized_device_id()}_{name}"
-        self._force_update = False
-        # self.throttled_update = Throttle(
-        #     timedelta(minutes=self._climote.refresh_interval)
-        # )(self._throttled_update)
         self._unique_id = f"climote_climate_{self._climote.device_id}_{self._zoneid}"
 
     @property
-    def should_poll(self):
-        return True
+    def available(self) -> bool:
+        """Nothing to show until the hub has reported at least once."""
+        return super().available and self._climote.has_status
 
     @property
     def hvac_mode(self):
         """Return current operation. ie. heat, cool, off."""
-        zone = "zone" + str(self._zoneid)
-        _LOGGER.debug(self._climote.data)
         return (
-            HVACMode.HEAT if self._climote.data[zone]["status"] == "5" else HVACMode.OFF
+            HVACMode.HEAT
+            if self._climote.status.zone(self._zoneid).heating
+            else HVACMode.OFF
         )
 
     @property
@@ -117,82 +107,52 @@ class ClimoteEntity(ClimateEntity):
 
     @property
     def current_temperature(self):
-        zone = "zone" + str(self._zoneid)
-        _LOGGER.info(
-            "Current_temperature: Zone: %s, Temp %s C",
-            zone,
-            self._climote.data[zone]["temperature"],
-        )
-        return (
-            int(self._climote.data[zone]["temperature"])
-            if self._climote.data[zone]["temperature"] != "--"
-            else 0
-        )
+        return self._climote.status.zone(self._zoneid).temperature
 
     @property
     def target_temperature(self):
         """Return the temperature we try to reach."""
-        zone = "zone" + str(self._zoneid)
-        _LOGGER.info("Target_temperature: %s", self._climote.data[zone]["thermostat"])
-        return int(self._climote.data[zone]["thermostat"])
+        return self._climote.status.zone(self._zoneid).thermostat
 
     @property
     def hvac_action(self):
         """Return current operation."""
-        zone = "zone" + str(self._zoneid)
         return (
             HVACAction.HEATING
-            if self._climote.data[zone]["status"] == "5"
+            if self._climote.status.zone(self._zoneid).heating
             else HVACAction.IDLE
         )
 
-    def set_hvac_mode(self, hvac_mode):
+    @property
+    def extra_state_attributes(self):
+        """Return how long ago the hub took these readings."""
+        data_age = self._climote.data_age()
+        return {"data_age": round(data_age) if data_age is not None else None}
+
+    async def async_set_hvac_mode(self, hvac_mode):
         if hvac_mode == HVACMode.HEAT:
             """Turn Heating Boost On."""
-            res = self._climote.boost(self._zoneid)
+            res = await self._climote.boost(self._zoneid)
             if res:
-                self._force_update = True
+                self.coordinator.async_schedule_confirmation()
             return res
         if hvac_mode == HVACAction.OFF:
             """Turn Heating Boost Off."""
-            res = self._climote.off(self._zoneid, 0)
+            res = await self._climote.off(self._zoneid, 0)
             if res:
-                self._force_update = True
+                self.coordinator.async_schedule_confirmation()
             return res
 
-    def set_temperature(self, **kwargs):
+    async def async_set_temperature(self, **kwargs):
         """Set new target temperature."""
         temperature = kwargs.get(ATTR_TEMPERATURE)
         if temperature is None:
             return
-        res = self._climote.set_target_temperature(self._zoneid, temperature)
+        res = await self._climote.set_target_temperature(self._zoneid, temperature)
         if res:
-            self._force_update = True
+            self.coordinator.async_schedule_confirmation()
         return res
 
-    # TODO do I need to switch to this when using coordinator?
-    # def async_update(self):
-    #     _LOGGER.info(f"ASYNC UPDATE called for {self.unique_id}")
-    #     a = 1
-
-    def update(self):
-        _LOGGER.info(f"UPDATE called for {self.unique_id}")
-        # a = 1
-        self._climote.attempt_timed_update()
-
-    # TODO look into what this is and how update above works
-    # Upon init, this method is wrapped inside a THrottle
-    # Throttle has a time which prevents this being called again during it
-    # That way this methof is only going to run once PER entity for the interval
-    #
-    # What I dont understand is how def update() wasn't forcing a lot of API calls
-    # because by default, when polling, its ccalled once per minute
-    # Putting the logic of has it been X minutes here simplifies the python class
-    # async def _throttled_update(self, **kwargs):
-    #     """Get the latest state from the thermostat with a throttle."""
-    #     _LOGGER.info("_throttled_update Force: %s", self._force_update)
-    #     self._climote.updateStatus(self._force_update)
-
     @property
     def device_info(self) -> DeviceInfo:
         """Return the device info."""
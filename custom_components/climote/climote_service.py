@@ -1,62 +1,120 @@
+import asyncio
+import contextlib
 import datetime
+from http import HTTPStatus
 import json
 
-from bs4 import BeautifulSoup
-from lxml import etree as ET
-import polling
-import requests
-import xmljson
+import aiohttp
+
+from .clock import Clock
+from .hub_clock import HubClock
+from .login_parser import parse_login_page
+from .metrics import ClimoteMetrics
+from .poll_strategy import DEFAULT_STATUS_TIMEOUT, PollStrategy
+from .rate_limit import HUB_BURST, HUB_RATE, CircuitBreaker, TokenBucket
+from .refresh_schedule import (
+    DEFAULT_DAILY_REFRESH_CAP,
+    DEFAULT_MAX_REFRESH_INTERVAL,
+    DEFAULT_MIN_REFRESH_INTERVAL,
+    RefreshSchedule,
+)
+from .schedule import HeatingSchedule, parse_schedule
+from .status import parse_status
 
 DEFAULT_BOOST_DURATION = "0.5"
 DEFAULT_REFRESH_INTERVAL = 12
+DEFAULT_IDLE_TIMEOUT = 300
+DEFAULT_COMMAND_DEBOUNCE = 0.5
+DEFAULT_CONFIRM_DELAY = 90
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 30
 
 # This would eventually be a python package, nothing HA specific in it
 class ClimoteService:
     _climote_service_instances = {}
 
-    @staticmethod
+    @classmethod
     def update_instance(
+        cls,
         passcode,
         username,
         password,
         refresh_interval,
+        status_timeout=DEFAULT_STATUS_TIMEOUT,
+        command_debounce=DEFAULT_COMMAND_DEBOUNCE,
+        confirm_delay=DEFAULT_CONFIRM_DELAY,
+        min_refresh_interval=DEFAULT_MIN_REFRESH_INTERVAL,
+        max_refresh_interval=DEFAULT_MAX_REFRESH_INTERVAL,
+        daily_refresh_cap=DEFAULT_DAILY_REFRESH_CAP,
     ):
-        instance = ClimoteService._climote_service_instances.get(passcode, None)
+        instance = cls._climote_service_instances.get(passcode, None)
         instance.creds = {
             "password": username,
             "username": passcode,
             "passcode": password,
         }
         instance.refresh_interval = instance.hours_to_seconds(refresh_interval)
+        schedule = instance.refresh_schedule
+        schedule.interval = instance.refresh_interval
+        schedule.min_interval = instance.hours_to_seconds(min_refresh_interval)
+        schedule.max_interval = instance.hours_to_seconds(max_refresh_interval)
+        schedule.daily_cap = daily_refresh_cap
+        instance.poll_strategy.timeout = status_timeout
+        instance.command_debounce = command_debounce
+        instance.confirm_delay = confirm_delay
         instance.logged_in = False
-        instance.update_in_progress = False
         instance.last_update_complete = None
-        instance.seconds_since_update = None
 
-    @staticmethod
+    @classmethod
     def get_instance(
+        cls,
         passcode,
         username,
         password,
         logger,
         refresh_interval: DEFAULT_REFRESH_INTERVAL,
         default_boost_duration: DEFAULT_BOOST_DURATION,
+        session: aiohttp.ClientSession = None,
+        status_timeout=DEFAULT_STATUS_TIMEOUT,
+        command_debounce=DEFAULT_COMMAND_DEBOUNCE,
+        confirm_delay=DEFAULT_CONFIRM_DELAY,
+        request_slots=None,
+        account_limiter=None,
+        clock=None,
+        min_refresh_interval=DEFAULT_MIN_REFRESH_INTERVAL,
+        max_refresh_interval=DEFAULT_MAX_REFRESH_INTERVAL,
+        daily_refresh_cap=DEFAULT_DAILY_REFRESH_CAP,
     ):
-        if not ClimoteService._climote_service_instances.get(passcode, None):
-            ClimoteService._climote_service_instances[passcode] = ClimoteService(
+        if not cls._climote_service_instances.get(passcode, None):
+            cls._climote_service_instances[passcode] = cls(
                 passcode,
                 username,
                 password,
                 logger,
+                session=session,
                 refresh_interval=refresh_interval,
                 default_boost_duration=default_boost_duration,
+                status_timeout=status_timeout,
+                command_debounce=command_debounce,
+                confirm_delay=confirm_delay,
+                request_slots=request_slots,
+                account_limiter=account_limiter,
+                clock=clock,
+                min_refresh_interval=min_refresh_interval,
+                max_refresh_interval=max_refresh_interval,
+                daily_refresh_cap=daily_refresh_cap,
             )
 
-        return ClimoteService._climote_service_instances[passcode]
+        return cls._climote_service_instances[passcode]
+
+    @classmethod
+    def release_instance(cls, passcode):
+        """Forget the instance so the next get_instance starts afresh"""
+        return cls._climote_service_instances.pop(passcode, None)
 
     class TimeoutException(RuntimeError):
         def __init__(self, arg):
-            self.args = arg
+            self.args = (arg,)
 
     def __init__(
         self,
@@ -66,16 +124,66 @@ class ClimoteService:
         logger,
         refresh_interval: DEFAULT_REFRESH_INTERVAL,
         default_boost_duration: DEFAULT_BOOST_DURATION,
+        session: aiohttp.ClientSession = None,
+        idle_timeout=DEFAULT_IDLE_TIMEOUT,
+        status_timeout=DEFAULT_STATUS_TIMEOUT,
+        command_debounce=DEFAULT_COMMAND_DEBOUNCE,
+        confirm_delay=DEFAULT_CONFIRM_DELAY,
+        request_slots=None,
+        account_limiter=None,
+        clock=None,
+        min_refresh_interval=DEFAULT_MIN_REFRESH_INTERVAL,
+        max_refresh_interval=DEFAULT_MAX_REFRESH_INTERVAL,
+        daily_refresh_cap=DEFAULT_DAILY_REFRESH_CAP,
     ):
-        self.s = requests.Session()
-        self.s.headers.update(
-            {"User-Agent": "Mozilla/5.0 Home Assistant Climote Service"}
+        # Everything time related goes through this, so it can be simulated
+        self.clock = clock or Clock()
+        # The session carries the login cookies so it must not be shared
+        # between hubs. The connection pool underneath it can be.
+        self.s = session
+        # Shared with other hubs to bound how many requests are out at once
+        self._request_slots = request_slots or contextlib.nullcontext()
+        # Every hub on the account shares account_limiter
+        self.rate_limiters = [TokenBucket(HUB_RATE, HUB_BURST, clock=self.clock)]
+        if account_limiter is not None:
+            self.rate_limiters.append(account_limiter)
+        self.breaker = CircuitBreaker(clock=self.clock)
+        self.metrics = ClimoteMetrics(clock=self.clock)
+        self.timeout = aiohttp.ClientTimeout(
+            sock_connect=DEFAULT_CONNECT_TIMEOUT, sock_read=DEFAULT_READ_TIMEOUT
         )
+        self.headers = {"User-Agent": "Mozilla/5.0 Home Assistant Climote Service"}
         self.config_id = None
         self.config = None
         self.logged_in = False
+        self.token = None
+        self.idle_timeout = idle_timeout
+        self._idle_handle = None
+        self._login_lock = asyncio.Lock()
+        # Status fetches in progress, so concurrent callers share one
+        self._in_flight = {}
+        self._status_lock = asyncio.Lock()
+        # Commands waiting to be sent, by endpoint then zone
+        self.command_debounce = command_debounce
+        self._pending_commands = {}
+        self._flush_handle = None
+        self._first_command_queued = None
+        # One batch at a time, so they reach the hub in the order they were made
+        self._send_lock = asyncio.Lock()
         self.creds = {"password": username, "username": passcode, "passcode": password}
+        # A placeholder until the hub or the cache gives us a real status
         self.data = json.loads(_DEFAULT_JSON)
+        self.status = parse_status(self.data)
+        self.has_status = False
+        self.hub_clock = HubClock()
+        # What commands should have changed, by zone then field, as
+        # (expected, previous) until a hub refresh confirms or refutes it
+        self.confirm_delay = confirm_delay
+        self.pending = {}
+        self.discrepancies = []
+        self.last_command = None
+        # Called whenever status changes outside of a refresh
+        self.on_status_change = None
         self.zones = None
         self.zones_boost_duration = {}
         global _LOGGER
@@ -83,11 +191,16 @@ class ClimoteService:
 
         self.device_id = passcode
         self.refresh_interval = self.hours_to_seconds(refresh_interval)
+        self.refresh_schedule = RefreshSchedule(
+            self.refresh_interval,
+            min_interval=self.hours_to_seconds(min_refresh_interval),
+            max_interval=self.hours_to_seconds(max_refresh_interval),
+            daily_cap=daily_refresh_cap,
+        )
         self.default_boost_duration = default_boost_duration
-        self.update_in_progress = False
+        self.poll_strategy = PollStrategy(timeout=status_timeout)
         self.last_update_complete = None
         self.last_update_attempt = None
-        self.seconds_since_update = None
 
     def hours_to_seconds(self, hours):
         return hours * 60 * 60
@@ -99,24 +212,72 @@ class ClimoteService:
     def get_sanitized_device_id(self):
         return ClimoteService.sanitized_device_id(self.device_id)
 
-    def initialize(self):
-        try:
-            self.__login()
-            self.__setConfig()
-            self.__setZones()
-            self.updateStatus(force=False)
-            return True if (self.config is not None) else False
-        finally:
-            self.__logout()
+    async def initialize(self):
+        # The login page is also where the heatingScheduleId comes from
+        if not await self.__ensure_logged_in():
+            return False
+        await self.__setConfig()
+        self.__setZones()
+        return True if (self.config is not None) else False
+
+    def snapshot(self):
+        """The parts of the hub state worth keeping across restarts"""
+        return {
+            "config_id": self.config_id,
+            "schedule": self.config.as_dict() if self.config else None,
+            "data": self.data if self.has_status else None,
+            "last_update_complete": self.last_update_complete.isoformat()
+            if self.last_update_complete
+            else None,
+            "reported": self.hub_clock.reported.isoformat()
+            if self.has_status and self.hub_clock.reported
+            else None,
+        }
 
-    def test_authenticate(self):
+    def restore(self, snapshot):
+        """Pick up from a snapshot() so entities exist before the hub answers"""
+        if not snapshot.get("schedule"):
+            return False
+        self.config_id = snapshot["config_id"]
+        self.config = HeatingSchedule.from_dict(snapshot["schedule"])
+        self.__setZones()
+        if snapshot.get("last_update_complete"):
+            self.last_update_complete = datetime.datetime.fromisoformat(
+                snapshot["last_update_complete"]
+            )
+        if snapshot.get("data"):
+            self.data = snapshot["data"]
+            self.status = parse_status(self.data)
+            self.has_status = True
+            if snapshot.get("reported"):
+                self.hub_clock.restore(
+                    self.status, datetime.datetime.fromisoformat(snapshot["reported"])
+                )
+            else:
+                # Saved before the report time was, it's no newer than the
+                # last update that completed
+                self.hub_clock.record(
+                    self.status,
+                    self.last_update_complete or self.clock.now(),
+                    fresh=False,
+                )
+        return bool(self.zones)
+
+    async def close(self):
+        """Log out now rather than waiting for the idle timeout"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            await self.__flush_commands()
+        self.__cancel_idle_logout()
+        if self.logged_in:
+            await self.__logout()
+
+    async def test_authenticate(self):
         # Very hacky...
-        # TODO raise TimeoutException("Could not connect to climote endpoint") if can't connect
-        r = self.s.post(_LOGIN_URL, data=self.creds)
-        if r.status_code == requests.codes.ok:
-            soup = BeautifulSoup(r.content, "lxml")
-            input = soup.find("input")  # First input has token "cs_token_rf"
-            if len(input["value"]) < 2:
+        status, text = await self.__post(_LOGIN_URL, data=self.creds)
+        if status == HTTPStatus.OK:
+            token, _ = parse_login_page(text)  # First input has "cs_token_rf"
+            if token is None or len(token) < 2:
                 return False
             return True
         return False
@@ -124,217 +285,500 @@ class ClimoteService:
     def setZoneBoostTime(self, zone, duration: str):
         self.zones_boost_duration[zone] = float(duration)
 
-    def __login(self):
-        r = self.s.post(_LOGIN_URL, data=self.creds)
-        if r.status_code == requests.codes.ok:
-            soup = BeautifulSoup(r.content, "lxml")
-            input = soup.find("input")  # First input has token "cs_token_rf"
-            if len(input["value"]) < 2:
+    async def __get(self, url, data=None, headers=None):
+        return await self.__http(self.s.get, url, data, headers)
+
+    async def __post(self, url, data=None, headers=None):
+        return await self.__http(self.s.post, url, data, headers)
+
+    async def __http(self, method, url, data, headers):
+        """Make one request, within the rate limits and while the cloud is up
+
+        Connection failures, timeouts and server errors all count towards
+        opening the circuit. While it is open this raises TimeoutException
+        without going to the network.
+        """
+        if not self.breaker.allow():
+            raise self.TimeoutException(
+                f"Climote cloud unavailable, retrying in {self.breaker.retry_in():.0f}s"
+            )
+        for limiter in self.rate_limiters:
+            await limiter.acquire()
+        async with self._request_slots:
+            started = self.clock.monotonic()
+            try:
+                async with method(
+                    url,
+                    data=data,
+                    headers={**self.headers, **(headers or {})},
+                    timeout=self.timeout,
+                ) as r:
+                    status, text = r.status, await r.text()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+                self.metrics.record_call(
+                    url,
+                    self.clock.monotonic() - started,
+                    failed=True,
+                    timed_out=isinstance(ex, asyncio.TimeoutError),
+                )
+                self.breaker.record_failure()
+                raise self.TimeoutException(
+                    "Could not connect to climote endpoint"
+                ) from ex
+        failed = status >= HTTPStatus.INTERNAL_SERVER_ERROR
+        self.metrics.record_call(url, self.clock.monotonic() - started, failed=failed)
+        if failed:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return status, text
+
+    async def __ensure_logged_in(self):
+        """Log in unless we already are
+
+        False if the credentials were rejected, None if the login page
+        didn't answer.
+        """
+        async with self._login_lock:
+            if self.logged_in:
+                return True
+            return await self.__login()
+
+    async def __request(self, method, url, data=None, headers=None):
+        """Make an authenticated request, logging in again if the session expired"""
+        for attempt in range(2):
+            logged_in = await self.__ensure_logged_in()
+            if logged_in is False:
+                raise AuthenticationError("Credentials were not accepted")
+            if not logged_in:
+                raise IllegalStateException("Not logged in")
+            if data is not None and "cs_token_rf" in data:
+                data = {**data, "cs_token_rf": self.token}
+
+            status, text = await method(url, data=data, headers=headers)
+            self.__schedule_idle_logout()
+            if not _is_session_expired(status, text):
+                return status, text
+
+            _LOGGER.info("Climote session expired, logging in again")
+            self.metrics.record_relogin()
+            self.logged_in = False
+        return status, text
+
+    def __schedule_idle_logout(self):
+        self.__cancel_idle_logout()
+        loop = asyncio.get_running_loop()
+        self._idle_handle = self.clock.call_later(
+            self.idle_timeout, lambda: loop.create_task(self.__idle_logout())
+        )
+
+    def __cancel_idle_logout(self):
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+
+    async def __idle_logout(self):
+        self._idle_handle = None
+        async with self._login_lock:
+            if self.logged_in:
+                _LOGGER.debug("Idle for %ss", self.idle_timeout)
+                await self.__logout()
+
+    async def __login(self):
+        status, text = await self.__post(_LOGIN_URL, data=self.creds)
+        if status == HTTPStatus.OK:
+            token, config_id = parse_login_page(text)  # First input has "cs_token_rf"
+            if token is None or len(token) < 2:
                 return False
             self.logged_in = True
-            self.token = input["value"]
-            str = r.text
-            sched = str.find(_SCHEDULE_ELEMENT)
-            if sched:
-                cut = str.find("&startday", sched)
-                str2 = str[sched : -(len(str) - cut)]
-                self.config_id = str2[49:]
+            self.token = token
+            if config_id:
+                self.config_id = config_id
                 _LOGGER.debug("heatingScheduleId:%s", self.config_id)
             return self.logged_in
 
-    def __logout(self):
+    async def __logout(self):
         _LOGGER.info("Logging Out")
-        r = self.s.get(_LOGOUT_URL)
-        _LOGGER.debug("Logging Out Result: %s", r.status_code)
-        return r.status_code == requests.codes.ok
+        self.logged_in = False
+        self.token = None
+        try:
+            status, _ = await self.__get(_LOGOUT_URL)
+        except self.TimeoutException:
+            # The session is dropped on our side either way
+            return False
+        _LOGGER.debug("Logging Out Result: %s", status)
+        return status == HTTPStatus.OK
 
-    def boost(self, zoneid):
+    async def boost(self, zoneid):
         _LOGGER.info("Boosting Zone %s", zoneid)
         time = self.zones_boost_duration.get(zoneid, float(self.default_boost_duration))
         self.set_hvac_mode_on(zoneid)
-        return self.__boost(zoneid, time)
+        res = False
+        try:
+            res = await self.__boost(zoneid, time)
+        finally:
+            if not res:
+                self.__rollback(zoneid, "heating")
+        return res
 
-    def off(self, zoneid, time):
+    async def off(self, zoneid, time):
         _LOGGER.info("Turning Off Zone %s", zoneid)
         self.set_hvac_mode_off(zoneid)
         # This should send 'stop' not a 0
-        return self.__boost(zoneid, time)
+        res = False
+        try:
+            res = await self.__boost(zoneid, time)
+        finally:
+            if not res:
+                self.__rollback(zoneid, "heating")
+        return res
 
     def set_hvac_mode_on(self, zoneid):
-        zone = "zone" + str(zoneid)
-        self.data[zone]["status"] = "5"
+        self.__expect(zoneid, heating=True)
 
     def set_hvac_mode_off(self, zoneid):
-        zone = "zone" + str(zoneid)
-        self.data[zone]["status"] = "null"
+        self.__expect(zoneid, heating=False)
 
     def set_temp_data(self, zoneid, temp):
-        zone = "zone" + str(zoneid)
-        self.data[zone]["thermostat"] = temp
+        self.__expect(zoneid, thermostat=int(temp))
+
+    def __expect(self, zoneid, **changes):
+        """Show what a command will do straight away, until the hub confirms it"""
+        zone = self.status.zone(zoneid)
+        expected = self.pending.setdefault(zoneid, {})
+        for name, value in changes.items():
+            previous = expected[name][1] if name in expected else getattr(zone, name)
+            expected[name] = (value, previous)
+        self.status = self.status.with_zone(zoneid, **changes)
+        self.last_command = self.clock.now()
+        self.refresh_schedule.observe(self.status, self.last_command, self.last_command)
+        self.__notify()
+
+    def __rollback(self, zoneid, name):
+        expected = self.pending.get(zoneid, {})
+        if name not in expected:
+            return
+        _, previous = expected.pop(name)
+        if not expected:
+            del self.pending[zoneid]
+        self.status = self.status.with_zone(zoneid, **{name: previous})
+        self.__notify()
+
+    def __notify(self):
+        if self.on_status_change is not None:
+            self.on_status_change()
+
+    def __set_status(self, data, confirmed, fresh=False):
+        """Take a new status from the hub, keeping or settling pending commands
+
+        Only a forced refresh started confirm_delay after the last command
+        settles them. Anything older, or the cloud's cached copy, may not
+        have caught up yet so the expected values stay on top of it. fresh
+        is for statuses the hub has only just sent.
+        """
+        self.data = data
+        self.status = parse_status(data)
+        self.has_status = True
+        self.hub_clock.record(self.status, self.clock.now(), fresh)
+        self.refresh_schedule.observe(self.status, self.last_command, self.clock.now())
+        if confirmed:
+            for zoneid, expected in self.pending.items():
+                zone = self.status.zone(zoneid)
+                for name, (value, _) in expected.items():
+                    if getattr(zone, name) != value:
+                        self.discrepancies.append(
+                            (zoneid, name, value, getattr(zone, name))
+                        )
+            self.pending = {}
+            return
+        for zoneid, expected in self.pending.items():
+            self.status = self.status.with_zone(
+                zoneid, **{name: value for name, (value, _) in expected.items()}
+            )
 
-    def getStatus(self, force):
-        # TODO: what uses this method?
-        try:
-            self.__login()
+    def pop_discrepancies(self):
+        """Commands the hub did not apply, as (zone, field, expected, actual)"""
+        discrepancies, self.discrepancies = self.discrepancies, []
+        return discrepancies
+
+    def data_age(self):
+        """Seconds since the hub reported the status we hold, None if unknown
+
+        It counts up between refreshes, and a cloud read of something the
+        hub sent by itself makes it younger.
+        """
+        age = self.hub_clock.data_age(self.clock.now())
+        if age is None and self.last_update_complete:
+            age = (self.clock.now() - self.last_update_complete).total_seconds()
+        return age
+
+    def forced_refresh_due(self):
+        """Whether the status is as old as the refresh schedule allows
+
+        The age is that of the hub's last report, so a cloud read of one it
+        sent by itself, after a command say, puts off waking it again. It is
+        never more than the time since the last forced refresh came back.
+        One that didn't come back is tried again after the minimum interval.
+        """
+        now = self.clock.now()
+        if (
+            self.last_update_attempt
+            and (now - self.last_update_attempt).total_seconds()
+            < self.refresh_schedule.min_interval
+        ):
+            return False
+        age = self.data_age()
+        if self.last_update_complete:
+            since = (now - self.last_update_complete).total_seconds()
+            age = since if age is None else min(age, since)
+        return self.refresh_schedule.due(age, self.status, self.last_command, now)
+
+    def boost_ends(self, zoneid):
+        """When the zone's boost runs out, None if it isn't boosting
+
+        timeRemaining counts from when the hub reported. The cloud's copy
+        may be from any time before now, hub_clock knows when that was.
+        """
+        zone = self.status.zone(zoneid)
+        if not zone.heating or not zone.time_remaining:
+            return None
+        reported = (
+            self.hub_clock.reported or self.last_update_complete or self.clock.now()
+        )
+        return reported + datetime.timedelta(minutes=zone.time_remaining)
+
+    async def getStatus(self):
+        """Read the cloud's last known status without waking the hub over SMS"""
+        if _FORCED_UPDATE in self._in_flight:
+            # About to have something fresher than the cloud's copy anyway
+            return await self.__single_flight(_FORCED_UPDATE, None)
+        return await self.__single_flight(_CLOUD_STATUS, self.__get_status)
+
+    async def updateStatus(self, force):
+        key = _FORCED_UPDATE if force else _UPDATE
+        return await self.__single_flight(key, lambda: self.__update_status(force))
+
+    async def __single_flight(self, key, factory):
+        """Run factory() once for everyone asking for key at the same time
+
+        Callers that arrive while it is running wait for the same result.
+        Shielded so one caller giving up doesn't cancel it for the others.
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(factory())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def __get_status(self):
+        async with self._status_lock:
             _LOGGER.info("Beginning Get Status")
-            self.__getStatus(force=True)
+            res = await self.__getStatus(force=True)
             _LOGGER.info("Ended Get Status")
-        finally:
-            self.__logout()
+            return res
+
+    async def __update_status(self, force):
+        # One SMS round trip at a time, the response endpoint has no request id
+        async with self._status_lock:
+            self.last_update_attempt = self.clock.now()
 
-    def updateStatus(self, force):
-        try:
-            self.__login()
             _LOGGER.info("Beginning Update Status")
-            self.__updateStatus(force=True)
+            res = False
+            try:
+                res = await self.__updateStatus(force=force)
+            finally:
+                # A forced refresh that raised still counts towards the cap
+                if force:
+                    self.refresh_schedule.record(
+                        self.last_update_attempt,
+                        self.refresh_schedule.is_active(
+                            self.status, self.last_command, self.clock.now()
+                        )
+                        if res
+                        else None,
+                    )
             _LOGGER.info("Ended Update Status")
-        finally:
-            self.update_in_progress = False
-            self.__logout()
+            if res:
+                self.last_update_complete = self.clock.now()
+            return res
 
-    def __getStatus(self, force):
+    async def __getStatus(self, force):
         res = None
-        tmp = self.s.headers
         try:
             # Make the initial request (force the update)
             if force:
-                r = self.s.get(_GET_STATUS_FORCE_URL, data=self.creds)
+                status, text = await self.__request(
+                    self.__get, _GET_STATUS_FORCE_URL, data=self.creds
+                )
             else:
-                r = self.s.get(_STATUS_URL, data=self.creds)
-            if r.text == "0":
+                status, text = await self.__request(
+                    self.__get, _STATUS_URL, data=self.creds
+                )
+            if status != HTTPStatus.OK or text == "0":
                 res = False
             else:
-                self.data = json.loads(r.text)
+                self.__set_status(json.loads(text), confirmed=False)
+                self.metrics.record_success()
                 res = True
-        except requests.exceptions.ConnectTimeout:
+        except (self.TimeoutException, ValueError):
             res = False
-        finally:
-            self.s.headers = tmp
         return res
 
     def __process_data(self):
         _LOGGER.info(f"Data back from API is {self.data}")
 
-    def __updateStatus(self, force):
-        def is_done(r):
-            return r.text != "0"
-
+    async def __updateStatus(self, force):
         res = None
-        tmp = self.s.headers
-        try:
-            # Make the initial request (force the update)
-            if force:
-                r = self.s.post(_STATUS_FORCE_URL, data=self.creds)
-            else:
-                r = self.s.post(_STATUS_URL, data=self.creds)
-
-            # Poll for the actual result. It happens over SMS so takes a while
-            self.s.headers.update({"X-Requested-With": "XMLHttpRequest"})
-            r = polling.poll(
-                lambda: self.s.post(_STATUS_RESPONSE_URL, data=self.creds),
-                step=10,
-                check_success=is_done,
-                poll_forever=False,
-                timeout=120,  # TODO make configurable
+        # Make the initial request (force the update)
+        requested = self.clock.now()
+        if force:
+            await self.__request(self.__post, _STATUS_FORCE_URL, data=self.creds)
+        else:
+            await self.__request(self.__post, _STATUS_URL, data=self.creds)
+
+        # Poll for the actual result. It happens over SMS so takes a while
+        started = self.clock.monotonic()
+        for polls, delay in enumerate(
+            self.poll_strategy.delays(self.clock.monotonic), 1
+        ):
+            await self.clock.sleep(delay)
+            status, text = await self.__request(
+                self.__post,
+                _STATUS_RESPONSE_URL,
+                data=self.creds,
+                headers={"X-Requested-With": "XMLHttpRequest"},
             )
-            if r.text == "0":
-                res = False
-            else:
-                self.data = json.loads(r.text)
-                self.__process_data()
-                res = True
-        except polling.TimeoutException:
+            if status != HTTPStatus.OK:
+                # The body is an error page, not a status
+                _LOGGER.info("Status response failed: %d", status)
+                return False
+            if text != "0":
+                self.poll_strategy.record(self.clock.monotonic() - started)
+                self.metrics.record_refresh(polls)
+                break
+        else:
             _LOGGER.info("Data failed coming back from API. Timeout.")
-            res = False
-        finally:
-            self.s.headers = tmp
+            self.metrics.record_refresh_timeout()
+            return False
+
+        confirmed = force and (
+            self.last_command is None
+            or (requested - self.last_command).total_seconds() >= self.confirm_delay
+        )
+        try:
+            data = json.loads(text)
+        except ValueError:
+            _LOGGER.info("Status response was not JSON: %.80s", text)
+            return False
+        self.__set_status(data, confirmed=confirmed, fresh=force)
+        self.metrics.record_success()
+        self.__process_data()
+        res = True
         return res
 
-    def __setConfig(self):
+    async def __setConfig(self):
         if self.logged_in is False:
             raise IllegalStateException("Not logged in")
 
-        r = self.s.get(_GET_SCHEDULE_URL + self.config_id)
-        data = r.content
-        xml = ET.fromstring(data)
-        self.config = xmljson.parker.data(xml)
+        status, text = await self.__request(
+            self.__get, _GET_SCHEDULE_URL + self.config_id
+        )
+        self.config = parse_schedule(text.encode())
 
     def __setZones(self):
         if self.config is None:
             return
 
-        zones = {}
-        i = 0
-        _LOGGER.debug("zoneInfo: %s", self.config["zoneInfo"]["zone"])
-        for zone in self.config["zoneInfo"]["zone"]:
-            i += 1
-            if zone["active"] == 1:
-                zones[i] = zone["label"]
-        self.zones = zones
+        _LOGGER.debug("zoneInfo: %s", self.config.zones)
+        self.zones = self.config.active_zones()
 
-    def set_target_temperature(self, zone, temp):
+    async def set_target_temperature(self, zone, temp):
         _LOGGER.debug("set_temperature zome:%s, temp:%s", zone, temp)
+        self.set_temp_data(zone, temp=temp)
         res = False
         try:
-            self.__login()
-            data = {
-                "temp-set-input[" + str(zone) + "]": temp,
-                "do": "Set",
-                "cs_token_rf": self.token,
-            }
-            r = self.s.post(_SET_TEMP_URL, data=data)
-            _LOGGER.info("set_temperature: %d", r.status_code)
-            res = r.status_code == requests.codes.ok
-            self.set_temp_data(zone, temp=temp)
-
+            res = await self.__queue_command(_SET_TEMP_URL, zone, temp)
         finally:
-            self.__logout()
+            if not res:
+                self.__rollback(zone, "thermostat")
         return res
 
-    def __boost(self, zoneid, time):
+    async def __boost(self, zoneid, time):
         """Turn on the heat for a given zone, for a given number of hours"""
-        res = False
-        try:
-            self.__login()
-            data = {"zoneIds[" + str(zoneid) + "]": time, "cs_token_rf": self.token}
-            r = self.s.post(_BOOST_URL, data=data)
-            _LOGGER.info("Boosting Result: %d", r.status_code)
-            res = r.status_code == requests.codes.ok
-        finally:
-            self.__logout()
-        return res
-
-    # Temporary method until I make a data coordinator and tidy up class
-    def attempt_timed_update(self):
-        # Last time this method was called
-        self.last_update_attempt = datetime.datetime.now()
-        # When to allow updates?
-        # Only allow updates every X hours, otherwise do nothing
-        # (Time of Attempt - Time Last Update) > X hours
-        # Also limit concurrently to one with update_in_progress bool
-        if self.update_in_progress:
-            # Already updating (Should be impossible given HA is singular by default)
-            _LOGGER.info("Climote update is already running")
-
-            return False
-
-        if self.last_update_complete:
-            self.seconds_since_update = (
-                self.last_update_attempt - self.last_update_complete
-            ).total_seconds()
-            if self.seconds_since_update < self.refresh_interval:
-                # Last update was within interval
-                _LOGGER.info(
-                    "%ds is still within interval %s. Not getting new data"
-                    % (self.seconds_since_update, self.refresh_interval)
+        return await self.__queue_command(_BOOST_URL, zoneid, time)
+
+    async def __queue_command(self, url, zoneid, value):
+        """Wait for a zone command to go out with any others sent close by
+
+        Each new command pushes the send back by command_debounce seconds
+        (but never more than _MAX_COMMAND_DELAY after the first one), so a
+        slider drag or a boost/off toggle only sends its final value. The
+        temperature and boost forms take a field per zone, so commands for
+        several zones share one request. Every caller for a zone gets the
+        result of the request that was actually sent.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        zones = self._pending_commands.setdefault(url, {})
+        _, waiters = zones.get(zoneid, (None, []))
+        zones[zoneid] = (value, waiters + [future])
+
+        now = self.clock.monotonic()
+        if self._flush_handle is None:
+            self._first_command_queued = now
+        else:
+            self._flush_handle.cancel()
+        self._flush_handle = self.clock.call_later(
+            min(
+                self.command_debounce,
+                self._first_command_queued + _MAX_COMMAND_DELAY - now,
+            ),
+            lambda: loop.create_task(self.__flush_commands()),
+        )
+        return await future
+
+    async def __flush_commands(self):
+        self._flush_handle = None
+        async with self._send_lock:
+            await self.__send_pending()
+
+    async def __send_pending(self):
+        pending, self._pending_commands = self._pending_commands, {}
+        for url, zones in pending.items():
+            try:
+                res = await self.__send_command(
+                    url, {zoneid: value for zoneid, (value, _) in zones.items()}
                 )
-                return False
-
-        self.update_in_progress = True
-        self.updateStatus(True)
-        self.last_update_complete = datetime.datetime.now()
-
+            except Exception as ex:  # pylint: disable=broad-except
+                for _, waiters in zones.values():
+                    for waiter in waiters:
+                        # A caller that was cancelled has stopped waiting
+                        if not waiter.done():
+                            waiter.set_exception(ex)
+                continue
+            for _, waiters in zones.values():
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(res)
+
+    async def __send_command(self, url, values):
+        if url == _SET_TEMP_URL:
+            data = {"temp-set-input[" + str(z) + "]": v for z, v in values.items()}
+            data["do"] = "Set"
+        else:
+            data = {"zoneIds[" + str(z) + "]": v for z, v in values.items()}
+        data["cs_token_rf"] = self.token
+        status, _ = await self.__request(self.__post, url, data=data)
+        _LOGGER.info("Command %s for zones %s: %d", url, list(values), status)
+        return status == HTTPStatus.OK
+
+
+def _is_session_expired(status, text):
+    """The server answers with the login form once the session or token is stale"""
+    if status in (HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN):
         return True
+    return _LOGIN_FORM_ELEMENT in text
 
 
 class IllegalStateException(RuntimeError):
@@ -342,6 +786,10 @@ class IllegalStateException(RuntimeError):
         self.args = arg
 
 
+class AuthenticationError(RuntimeError):
+    """Logging in again was refused, the password has changed say"""
+
+
 _DEFAULT_JSON = (
     '{ "holiday": "00", "hold": null, "updated_at": "00:00", '
     '"unit_time": "00:00", "zone1": { "burner": 0, "status": null, '
@@ -352,7 +800,7 @@ _DEFAULT_JSON = (
 )
 _LOGIN_URL = "https://climote.climote.ie/manager/login"
 _LOGOUT_URL = "https://climote.climote.ie/manager/logout"
-_SCHEDULE_ELEMENT = "/manager/edit-heating-schedule?heatingScheduleId"
+_LOGIN_FORM_ELEMENT = 'name="passcode"'
 
 _STATUS_URL = "https://climote.climote.ie/manager/get-status"
 _STATUS_FORCE_URL = _STATUS_URL + "?force=1"
@@ -360,6 +808,11 @@ _GET_STATUS_FORCE_URL = _STATUS_URL + "?force=0"
 _STATUS_RESPONSE_URL = (
     "https://climote.climote.ie/manager/" "waiting-get-status-response"
 )
+_MAX_COMMAND_DELAY = 5
+# __single_flight keys
+_CLOUD_STATUS = "get-status"
+_UPDATE = "update"
+_FORCED_UPDATE = "forced-update"
 _BOOST_URL = "https://climote.climote.ie/manager/boost"
 _SET_TEMP_URL = "https://climote.climote.ie/manager/temperature"
 _GET_SCHEDULE_URL = (
@@ -0,0 +1,97 @@
+"""Where ClimoteService and friends get the time from."""
+import asyncio
+import datetime
+import heapq
+import itertools
+import time
+
+# How many times advance() lets the loop run between timers, enough for
+# the tasks a timer wakes to reach their next sleep when nothing real
+# (network, threads) is involved
+_SETTLE_ROUNDS = 20
+
+
+class Clock:
+    """Real time: wall clock, monotonic clock, sleeps and timers."""
+
+    def now(self):
+        return datetime.datetime.now()
+
+    def monotonic(self):
+        return time.monotonic()
+
+    async def sleep(self, seconds):
+        await asyncio.sleep(seconds)
+
+    def call_later(self, delay, callback):
+        return asyncio.get_running_loop().call_later(delay, callback)
+
+
+class _TimerHandle:
+    def __init__(self, callback):
+        self._callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        if not self.cancelled:
+            self._callback()
+
+
+class SimulatedClock(Clock):
+    """Time that only moves when advance() is called.
+
+    Sleeps and timers fire in order as advance() reaches them, so a week
+    of refreshes, rate limiting and boost countdowns runs as fast as the
+    code in between allows. Only works for code that waits through the
+    clock, with nothing real like a socket underneath it.
+    """
+
+    def __init__(self, start=datetime.datetime(2024, 1, 1)):
+        self._start = start
+        self._elapsed = 0.0
+        self._timers = []
+        self._order = itertools.count()
+
+    def now(self):
+        return self._start + datetime.timedelta(seconds=self._elapsed)
+
+    def monotonic(self):
+        return self._elapsed
+
+    async def sleep(self, seconds):
+        if seconds <= 0:
+            await asyncio.sleep(0)
+            return
+        woken = asyncio.get_running_loop().create_future()
+        handle = self.call_later(
+            seconds, lambda: woken.done() or woken.set_result(None)
+        )
+        try:
+            await woken
+        finally:
+            handle.cancel()
+
+    def call_later(self, delay, callback):
+        handle = _TimerHandle(callback)
+        heapq.heappush(
+            self._timers, (self._elapsed + max(0, delay), next(self._order), handle)
+        )
+        return handle
+
+    async def advance(self, seconds):
+        """Move time forward, running every timer that falls due on the way"""
+        target = self._elapsed + seconds
+        await self._settle()
+        while self._timers and self._timers[0][0] <= target:
+            when, _, handle = heapq.heappop(self._timers)
+            self._elapsed = max(self._elapsed, when)
+            handle.run()
+            await self._settle()
+        self._elapsed = target
+
+    async def _settle(self):
+        for _ in range(_SETTLE_ROUNDS):
+            await asyncio.sleep(0)
@@ -10,19 +10,38 @@ from homeassistant import config_entries
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
 
-from .climote_service import ClimoteService
+from .climote_service import (
+    DEFAULT_COMMAND_DEBOUNCE,
+    DEFAULT_CONFIRM_DELAY,
+    ClimoteService,
+)
 from .climote_service_stub import ClimoteService as ClimoteServiceStub
 from .const import (
     BOOST_DURATION,
     CLIMOTE_ID,
+    CLOUD_INTERVAL,
+    COMMAND_DEBOUNCE,
+    CONFIRM_DELAY,
+    DAILY_REFRESH_CAP,
     DOMAIN,
+    MAX_REFRESH_INTERVAL,
+    MIN_REFRESH_INTERVAL,
     PASSWORD,
     REFRESH_INTERVAL,
+    STATUS_TIMEOUT,
     USERNAME,
     VALID_BOOST_VALUES,
     TEST_MODE,
 )
+from .coordinator import DEFAULT_CLOUD_INTERVAL
+from .poll_strategy import DEFAULT_STATUS_TIMEOUT
+from .refresh_schedule import (
+    DEFAULT_DAILY_REFRESH_CAP,
+    DEFAULT_MAX_REFRESH_INTERVAL,
+    DEFAULT_MIN_REFRESH_INTERVAL,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -50,19 +69,30 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
 
     if data[TEST_MODE] is False:
         climote = ClimoteService
+        # Only needed for this one check, on the shared connection pool
+        session = async_create_clientsession(hass, auto_cleanup=False)
     else:
+        # Test mode replays a recording instead of using a session
         climote = ClimoteServiceStub
+        session = None
 
     temp_climote_object = climote(
-        data[CLIMOTE_ID], data[USERNAME], data[PASSWORD], _LOGGER, 12, 1
+        data[CLIMOTE_ID],
+        data[USERNAME],
+        data[PASSWORD],
+        _LOGGER,
+        12,
+        1,
+        session=session,
     )
 
     try:
-        auth_successful = await hass.async_add_executor_job(
-            temp_climote_object.test_authenticate
-        )
+        auth_successful = await temp_climote_object.test_authenticate()
     except climote.TimeoutException as exc:
         raise CannotConnect from exc
+    finally:
+        if session is not None:
+            session.detach()
 
     if not auth_successful:
         raise InvalidAuth
@@ -175,6 +205,48 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                     REFRESH_INTERVAL,
                     default=self.config_entry.data.get(REFRESH_INTERVAL),
                 ): int,
+                vol.Required(
+                    MIN_REFRESH_INTERVAL,
+                    default=self.config_entry.data.get(
+                        MIN_REFRESH_INTERVAL, DEFAULT_MIN_REFRESH_INTERVAL
+                    ),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0.25)),
+                vol.Required(
+                    MAX_REFRESH_INTERVAL,
+                    default=self.config_entry.data.get(
+                        MAX_REFRESH_INTERVAL, DEFAULT_MAX_REFRESH_INTERVAL
+                    ),
+                ): vol.All(vol.Coerce(float), vol.Range(min=1)),
+                vol.Required(
+                    DAILY_REFRESH_CAP,
+                    default=self.config_entry.data.get(
+                        DAILY_REFRESH_CAP, DEFAULT_DAILY_REFRESH_CAP
+                    ),
+                ): vol.All(int, vol.Range(min=1)),
+                vol.Required(
+                    CLOUD_INTERVAL,
+                    default=self.config_entry.data.get(
+                        CLOUD_INTERVAL, DEFAULT_CLOUD_INTERVAL
+                    ),
+                ): vol.All(int, vol.Range(min=1)),
+                vol.Required(
+                    STATUS_TIMEOUT,
+                    default=self.config_entry.data.get(
+                        STATUS_TIMEOUT, DEFAULT_STATUS_TIMEOUT
+                    ),
+                ): vol.All(int, vol.Range(min=10)),
+                vol.Required(
+                    COMMAND_DEBOUNCE,
+                    default=self.config_entry.data.get(
+                        COMMAND_DEBOUNCE, DEFAULT_COMMAND_DEBOUNCE
+                    ),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=5)),
+                vol.Required(
+                    CONFIRM_DELAY,
+                    default=self.config_entry.data.get(
+                        CONFIRM_DELAY, DEFAULT_CONFIRM_DELAY
+                    ),
+                ): vol.All(int, vol.Range(min=10)),
                 vol.Required(
                     TEST_MODE,
                     default=self.config_entry.data.get(TEST_MODE),
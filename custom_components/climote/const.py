@@ -8,6 +8,15 @@ PASSWORD = "password"
 REFRESH_INTERVAL = "interval"
 BOOST_DURATION = "boost"
 TEST_MODE = "test"
+STATUS_TIMEOUT = "status_timeout"
+COMMAND_DEBOUNCE = "debounce"
+CLOUD_INTERVAL = "cloud_interval"
+CONFIRM_DELAY = "confirm_delay"
+MIN_REFRESH_INTERVAL = "min_interval"
+MAX_REFRESH_INTERVAL = "max_interval"
+DAILY_REFRESH_CAP = "daily_cap"
+# configuration.yaml, shared by every hub
+MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
 
 VALID_BOOST_VALUES = [
     "0.5",
@@ -0,0 +1,118 @@
+"""Data update coordinator for the Climate Climote integration."""
+from __future__ import annotations
+
+from datetime import timedelta
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .climote_service import AuthenticationError, IllegalStateException
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_CLOUD_INTERVAL = 5
+EVENT_COMMAND_NOT_APPLIED = f"{DOMAIN}_command_not_applied"
+
+
+class ClimoteCoordinator(DataUpdateCoordinator):
+    """Refresh one Climote hub and share the result with all of its zones.
+
+    Every cloud_interval minutes it reads the status the cloud already
+    has, which is cheap and picks up changes made from the Climote app.
+    Only once the hub's refresh schedule says so (or when asked) does it
+    force the hub to report in over SMS.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        climote_service,
+        cloud_interval=DEFAULT_CLOUD_INTERVAL,
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"climote_{climote_service.get_sanitized_device_id()}",
+            update_interval=timedelta(minutes=cloud_interval),
+        )
+        self.climote = climote_service
+        self.climote.on_status_change = self.async_update_listeners
+        self._force_next = False
+        self._unsub_confirm = None
+
+    def set_cloud_interval(self, cloud_interval) -> None:
+        """Pick up a changed cloud read interval."""
+        self.update_interval = timedelta(minutes=cloud_interval)
+
+    async def async_force_refresh(self) -> None:
+        """Ask the hub for its status now rather than at the next interval."""
+        self._force_next = True
+        await self.async_refresh()
+
+    @callback
+    def async_schedule_confirmation(self) -> None:
+        """Check with the hub once confirm_delay has passed since the last command."""
+        if self._unsub_confirm is not None:
+            self._unsub_confirm()
+        self._unsub_confirm = async_call_later(
+            self.hass, self.climote.confirm_delay, self._async_confirm
+        )
+
+    async def _async_confirm(self, _now) -> None:
+        self._unsub_confirm = None
+        await self.async_force_refresh()
+
+    async def async_shutdown(self) -> None:
+        """Cancel any pending confirmation."""
+        if self._unsub_confirm is not None:
+            self._unsub_confirm()
+            self._unsub_confirm = None
+        await super().async_shutdown()
+
+    async def _async_update_data(self):
+        """Fetch the latest status, from the hub or the cloud."""
+        try:
+            if self._force_next or self.climote.forced_refresh_due():
+                self._force_next = False
+                if not await self.climote.updateStatus(True):
+                    raise UpdateFailed(
+                        "Timed out waiting for the hub to report its status"
+                    )
+                self._report_discrepancies()
+            elif not await self.climote.getStatus():
+                raise UpdateFailed("The cloud did not return a status")
+        except self.climote.TimeoutException as ex:
+            # Entities go unavailable until the cloud answers again
+            raise UpdateFailed(str(ex)) from ex
+        except AuthenticationError as ex:
+            # Starts a reauth flow
+            raise ConfigEntryAuthFailed("Credentials were not accepted") from ex
+        except IllegalStateException as ex:
+            raise UpdateFailed("Could not log in to Climote") from ex
+        return self.climote.status
+
+    def _report_discrepancies(self) -> None:
+        for zone_id, name, expected, actual in self.climote.pop_discrepancies():
+            _LOGGER.warning(
+                "Hub %s zone %s has %s=%s, expected %s after the last command",
+                self.climote.get_sanitized_device_id(),
+                zone_id,
+                name,
+                actual,
+                expected,
+            )
+            self.hass.bus.async_fire(
+                EVENT_COMMAND_NOT_APPLIED,
+                {
+                    "device_id": self.climote.device_id,
+                    "zone": zone_id,
+                    "attribute": name,
+                    "expected": expected,
+                    "actual": actual,
+                },
+            )
@@ -0,0 +1,46 @@
+"""Diagnostics support for the Climate Climote integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CLIMOTE_ID, DOMAIN, PASSWORD, USERNAME
+
+TO_REDACT = {CLIMOTE_ID, PASSWORD, USERNAME}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    climote = coordinator.climote
+    return {
+        "entry": async_redact_data(entry.data, TO_REDACT),
+        "hub": {
+            "device_id": climote.get_sanitized_device_id(),
+            "zones": climote.zones,
+            "last_update_attempt": climote.last_update_attempt.isoformat()
+            if climote.last_update_attempt
+            else None,
+            "last_update_complete": climote.last_update_complete.isoformat()
+            if climote.last_update_complete
+            else None,
+            "last_update_success": coordinator.last_update_success,
+            "circuit_open": climote.breaker.is_open,
+            "poll_latencies": list(climote.poll_strategy.latencies),
+            "hub_clock_offsets": list(climote.hub_clock.hub_offsets),
+            "cloud_clock_offsets": list(climote.hub_clock.cloud_offsets),
+            "data_age": climote.data_age(),
+            "refresh_interval": climote.refresh_schedule.current_interval(
+                climote.status, climote.last_command, climote.clock.now()
+            ),
+            "idle_refreshes": climote.refresh_schedule.idle_streak,
+            "refreshes_today": len(climote.refresh_schedule.sent),
+        },
+        "metrics": climote.metrics.as_dict(),
+        "status": climote.data,
+    }
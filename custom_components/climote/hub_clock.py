@@ -0,0 +1,99 @@
+"""How far the hub's and the cloud's clocks are from ours, and how old a report is."""
+from collections import deque
+import datetime
+import statistics
+
+from .status import place_time
+
+# Status times are truncated to the minute, on average half a minute behind
+_TRUNCATION = datetime.timedelta(seconds=30)
+# Once shifted by the estimated offset a status time is at most a few
+# minutes ahead of ours, the margin for the estimate being off
+_AHEAD = datetime.timedelta(minutes=5)
+_HALF_DAY = 12 * 60 * 60
+
+
+def _offset(value, received):
+    """Seconds a clock reading value is ahead of received, either side of midnight"""
+    reading = datetime.datetime.combine(received.date(), value) + _TRUNCATION
+    offset = (reading - received).total_seconds()
+    return (offset + _HALF_DAY) % (2 * _HALF_DAY) - _HALF_DAY
+
+
+class HubClock:
+    """Running estimates of the hub and cloud clock offsets, and report times.
+
+    unit_time is the hub's clock when it sent a report and updated_at the
+    cloud's when it arrived. A status fresh from a forced refresh arrived
+    just before we got it, so then both say how far their clock is ahead
+    of ours. The median of the last few of each is the offset. Any status,
+    fresh or the cloud's copy, is placed on our clock from updated_at, or
+    from unit_time when there's no updated_at. The cloud hands back the
+    same copy until the hub reports again, which keeps the time it was
+    first placed at, or the same times would land on a later day once
+    they are a day old.
+    """
+
+    def __init__(self, history=10):
+        self.hub_offsets = deque(maxlen=history)
+        self.cloud_offsets = deque(maxlen=history)
+        # Our time for when the hub reported the status we hold, and the
+        # status times it was placed from
+        self.reported = None
+        self._placed_from = None
+
+    @property
+    def hub_offset(self):
+        """Seconds the hub clock is ahead of ours, 0 until it has answered"""
+        return statistics.median(self.hub_offsets) if self.hub_offsets else 0.0
+
+    @property
+    def cloud_offset(self):
+        """Seconds the cloud clock is ahead of ours, 0 until the hub has answered"""
+        return statistics.median(self.cloud_offsets) if self.cloud_offsets else 0.0
+
+    def record(self, status, received, fresh):
+        """Take in a status that arrived at received, fresh from the hub or not"""
+        times = (status.updated_at, status.unit_time)
+        if fresh:
+            if status.unit_time is not None:
+                self.hub_offsets.append(_offset(status.unit_time, received))
+            if status.updated_at is not None:
+                self.cloud_offsets.append(_offset(status.updated_at, received))
+        elif times == self._placed_from and self.reported is not None:
+            # The same report again
+            return
+        # A fresh status was just reported, so it's the nearest placement
+        # even when this reading is well off the median. A cloud copy can
+        # be most of a day old.
+        ahead = datetime.timedelta(seconds=_HALF_DAY) if fresh else _AHEAD
+        reported = self.to_local(status, received, ahead)
+        if reported is None:
+            reported = received if fresh else None
+        else:
+            # Nothing can have been reported after we got it
+            reported = min(reported, received)
+        self.reported = reported
+        self._placed_from = times
+
+    def restore(self, status, reported):
+        """Take status back as reported at reported, from before a restart"""
+        self.reported = reported
+        self._placed_from = (status.updated_at, status.unit_time)
+
+    def to_local(self, status, now, ahead=_AHEAD):
+        """When the hub reported status, by our clock"""
+        for value, offset in (
+            (status.updated_at, self.cloud_offset),
+            (status.unit_time, self.hub_offset),
+        ):
+            if value is not None:
+                shift = datetime.timedelta(seconds=offset)
+                return place_time(value, now + shift, ahead) + _TRUNCATION - shift
+        return None
+
+    def data_age(self, now):
+        """Seconds since the hub reported the status we hold, None if unknown"""
+        if self.reported is None:
+            return None
+        return max(0.0, (now - self.reported).total_seconds())
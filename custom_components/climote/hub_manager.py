@@ -0,0 +1,82 @@
+"""Shared state for every Climote hub set up in this Home Assistant."""
+from __future__ import annotations
+
+import asyncio
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+
+from .clock import Clock
+from .const import DOMAIN
+from .rate_limit import ACCOUNT_BURST, ACCOUNT_RATE, TokenBucket
+
+DATA_HUB_MANAGER = f"{DOMAIN}_hub_manager"
+DEFAULT_MAX_CONCURRENT_REQUESTS = 8
+
+# Fractional part of the golden ratio, spreads any number of hubs evenly
+_SPREAD = 0.6180339887498949
+
+
+@callback
+def async_get_hub_manager(
+    hass: HomeAssistant, max_concurrent=DEFAULT_MAX_CONCURRENT_REQUESTS
+) -> ClimoteHubManager:
+    """Get the manager, creating it with max_concurrent the first time."""
+    if DATA_HUB_MANAGER not in hass.data:
+        hass.data[DATA_HUB_MANAGER] = ClimoteHubManager(hass, max_concurrent)
+    return hass.data[DATA_HUB_MANAGER]
+
+
+class ClimoteHubManager:
+    """Connections, request slots and refresh timing shared by all hubs.
+
+    Every hub gets its own session, since the login is cookie based, but
+    they all sit on Home Assistant's keep-alive pool. Requests to the
+    cloud are limited to max_concurrent at a time across every hub. The
+    wait for a hub to answer over SMS doesn't hold a slot, so many hubs
+    refresh in about the time the slowest one takes. Hubs share the
+    manager's clock too, since their account rate limits are shared.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_concurrent=DEFAULT_MAX_CONCURRENT_REQUESTS,
+        clock=None,
+    ) -> None:
+        """Initialize the manager."""
+        self.hass = hass
+        self.clock = clock or Clock()
+        self.request_slots = asyncio.Semaphore(max_concurrent)
+        self._sessions = {}
+        self._slots = {}
+        self._account_limiters = {}
+
+    @callback
+    def async_create_session(self, device_id):
+        """A session for one hub on the shared connection pool."""
+        session = async_create_clientsession(self.hass, auto_cleanup=False)
+        self._sessions[device_id] = session
+        self._slots.setdefault(device_id, len(self._slots))
+        return session
+
+    def account_limiter(self, username) -> TokenBucket:
+        """The rate limit shared by every hub on one Climote account."""
+        if username not in self._account_limiters:
+            self._account_limiters[username] = TokenBucket(
+                ACCOUNT_RATE, ACCOUNT_BURST, clock=self.clock
+            )
+        return self._account_limiters[username]
+
+    def stagger_delay(self, device_id, interval) -> float:
+        """How far into interval this hub should refresh, so hubs set up
+        together don't all hit the cloud at once"""
+        slot = self._slots.get(device_id, 0)
+        return (slot * _SPREAD) % 1 * interval
+
+    @callback
+    def async_release(self, device_id) -> None:
+        """Let go of a hub's session, leaving the shared pool open."""
+        session = self._sessions.pop(device_id, None)
+        if session is not None:
+            session.detach()
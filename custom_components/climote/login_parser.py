@@ -0,0 +1,42 @@
+"""Pull the CSRF token and schedule id out of the Climote manager page."""
+import re
+
+from bs4 import BeautifulSoup
+
+_SCHEDULE_ELEMENT = "/manager/edit-heating-schedule?heatingScheduleId"
+
+_FIRST_INPUT_RE = re.compile(r"<input\b[^>]*>", re.IGNORECASE)
+_VALUE_RE = re.compile(
+    r"""(?:^|\s)value\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.IGNORECASE
+)
+_SCHEDULE_ID_RE = re.compile(re.escape(_SCHEDULE_ELEMENT) + r"=([^&\"'<>\s]*)")
+
+
+def parse_login_page(text):
+    """Return (token, heatingScheduleId) from the page served after login
+
+    Either can be None. The first <input> on the page carries cs_token_rf.
+    This is a regex scan of the page; only if it can't find that input do
+    we fall back to building a full BeautifulSoup tree.
+    """
+    return _find_token(text), _find_schedule_id(text)
+
+
+def _find_token(text):
+    match = _FIRST_INPUT_RE.search(text)
+    if match is not None:
+        value = _VALUE_RE.search(match.group(0))
+        if value is not None:
+            return next(v for v in value.groups() if v is not None)
+
+    input = BeautifulSoup(text, "lxml").find("input")
+    if input is None:
+        return None
+    return input.get("value")
+
+
+def _find_schedule_id(text):
+    match = _SCHEDULE_ID_RE.search(text)
+    if match is None:
+        return None
+    return match.group(1)
@@ -0,0 +1,150 @@
+"""How long calls to the Climote cloud take and how often they fail."""
+import bisect
+from urllib.parse import urlsplit
+
+from .clock import Clock
+
+# Upper bounds in seconds. Anything slower lands in the last, open ended bucket
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+class Histogram:
+    """Counts per bucket, enough for rough percentiles."""
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, latency):
+        self.counts[bisect.bisect_left(self.bounds, latency)] += 1
+        self.count += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile, None if empty"""
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": self.max,
+            "buckets": dict(zip([*map(str, self.bounds), "+Inf"], self.counts)),
+        }
+
+
+class EndpointStats:
+    """Calls to one endpoint and how they turned out."""
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.latency = Histogram()
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "latency": self.latency.as_dict(),
+        }
+
+
+class ClimoteMetrics:
+    """Everything ClimoteService counts about one hub.
+
+    Endpoints are keyed by the last part of their path, e.g. "login" or
+    "waiting-get-status-response". A failure is a connection error or a
+    server error, a timeout is counted on its own and not as a failure.
+    """
+
+    def __init__(self, clock=None):
+        self._clock = clock or Clock()
+        self.endpoints = {}
+        self.relogins = 0
+        self.refreshes = 0
+        self.refresh_timeouts = 0
+        self.last_poll_iterations = None
+        self.poll_iterations = Histogram(bounds=(1, 2, 3, 5, 8, 13, 21))
+        self.last_success = None
+
+    @staticmethod
+    def endpoint_name(url):
+        parts = urlsplit(url)
+        name = parts.path.rstrip("/").rsplit("/", 1)[-1]
+        # Waking the hub and reading the cloud's copy are very different calls
+        if parts.query.startswith("force="):
+            name += "?" + parts.query
+        return name
+
+    def endpoint(self, url):
+        name = self.endpoint_name(url)
+        if name not in self.endpoints:
+            self.endpoints[name] = EndpointStats()
+        return self.endpoints[name]
+
+    def record_call(self, url, latency, failed=False, timed_out=False):
+        stats = self.endpoint(url)
+        stats.calls += 1
+        stats.latency.record(latency)
+        if timed_out:
+            stats.timeouts += 1
+        elif failed:
+            stats.failures += 1
+
+    def record_relogin(self):
+        self.relogins += 1
+
+    def record_refresh(self, poll_iterations):
+        """A status came back after poll_iterations waiting-get-status-response calls"""
+        self.refreshes += 1
+        self.last_poll_iterations = poll_iterations
+        self.poll_iterations.record(poll_iterations)
+
+    def record_refresh_timeout(self):
+        """The hub never answered within the status timeout"""
+        self.refresh_timeouts += 1
+
+    def record_success(self):
+        self.last_success = self._clock.now()
+
+    def last_success_age(self):
+        """Seconds since a status last came back, None if one never has"""
+        if self.last_success is None:
+            return None
+        return (self._clock.now() - self.last_success).total_seconds()
+
+    def as_dict(self):
+        return {
+            "endpoints": {
+                name: stats.as_dict() for name, stats in sorted(self.endpoints.items())
+            },
+            "relogins": self.relogins,
+            "refreshes": self.refreshes,
+            "refresh_timeouts": self.refresh_timeouts,
+            "last_poll_iterations": self.last_poll_iterations,
+            "poll_iterations": self.poll_iterations.as_dict(),
+            "last_success": self.last_success.isoformat()
+            if self.last_success
+            else None,
+            "last_success_age": self.last_success_age(),
+        }
@@ -0,0 +1,59 @@
+"""Timing of the waiting-get-status-response polls during an SMS round trip."""
+from collections import deque
+import random
+import statistics
+
+DEFAULT_STATUS_TIMEOUT = 120
+
+
+class PollStrategy:
+    """Exponential backoff with a jittered cap that learns from past responses.
+
+    The hub answers over SMS so nothing useful comes back for the first few
+    seconds. Once a few round trips have been seen, the first poll is pushed
+    out to just before the fastest typical response instead of starting
+    from scratch every time.
+    """
+
+    def __init__(
+        self,
+        timeout=DEFAULT_STATUS_TIMEOUT,
+        initial=2.0,
+        factor=1.6,
+        cap=15.0,
+        jitter=0.25,
+        history=20,
+    ):
+        self.timeout = timeout
+        self.initial = initial
+        self.factor = factor
+        self.cap = cap
+        self.jitter = jitter
+        self.latencies = deque(maxlen=history)
+
+    def record(self, latency):
+        """Remember how long a successful round trip took"""
+        self.latencies.append(latency)
+
+    def first_delay(self):
+        if len(self.latencies) < 3:
+            return self.initial
+        # Aim a little ahead of the quickest fifth of past responses
+        fastest = statistics.quantiles(self.latencies, n=5)[0]
+        return min(max(self.initial, fastest * 0.9), self.timeout)
+
+    def delays(self, now):
+        """Yield how long to sleep before each poll until the timeout is spent
+
+        now is a monotonic clock, so the time spent in the requests
+        themselves counts towards the timeout.
+        """
+        deadline = now() + self.timeout
+        delay = self.first_delay()
+        while True:
+            remaining = deadline - now()
+            if remaining <= 0:
+                return
+            yield min(delay, remaining)
+            step = min(delay * self.factor, self.cap)
+            delay = step * random.uniform(1 - self.jitter, 1 + self.jitter)
@@ -0,0 +1,104 @@
+"""Client side limits on how hard the Climote cloud gets hit."""
+from .clock import Clock
+
+HUB_RATE = 1.0
+HUB_BURST = 5
+ACCOUNT_RATE = 2.0
+ACCOUNT_BURST = 10
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_BACKOFF = 30
+DEFAULT_MAX_BACKOFF = 30 * 60
+
+
+class TokenBucket:
+    """Allow rate requests a second on average, up to burst at once.
+
+    Each caller takes its token straight away, going into debt if there
+    are none left, and sleeps until the debt is paid off. Callers are
+    served in the order they arrived.
+    """
+
+    def __init__(self, rate, burst, clock=None):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self._clock = clock or Clock()
+        self._updated = self._clock.monotonic()
+
+    def reserve(self):
+        """Take a token, returning how long to wait before using it"""
+        now = self._clock.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self.tokens -= 1
+        return max(0.0, -self.tokens / self.rate)
+
+    async def acquire(self):
+        delay = self.reserve()
+        if delay:
+            await self._clock.sleep(delay)
+
+
+class CircuitBreaker:
+    """Stop calling a cloud that keeps failing, then probe it now and again.
+
+    After threshold failures in a row the circuit opens and requests
+    should fail straight away. Once backoff has passed a single probe is
+    let through. If it fails the backoff doubles, up to max_backoff,
+    and any success closes the circuit again.
+    """
+
+    def __init__(
+        self,
+        threshold=DEFAULT_FAILURE_THRESHOLD,
+        backoff=DEFAULT_BACKOFF,
+        max_backoff=DEFAULT_MAX_BACKOFF,
+        clock=None,
+    ):
+        self.threshold = threshold
+        self.initial_backoff = backoff
+        self.max_backoff = max_backoff
+        self.backoff = backoff
+        self.failures = 0
+        self._clock = clock or Clock()
+        self._opened_at = None
+        self._probe_started = None
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+    def retry_in(self):
+        """Seconds until the next probe is allowed, 0 if closed"""
+        if self._opened_at is None:
+            return 0
+        return max(0, self._opened_at + self.backoff - self._clock.monotonic())
+
+    def allow(self):
+        """Whether a request may go out now"""
+        if self._opened_at is None:
+            return True
+        now = self._clock.monotonic()
+        if self._probe_started is not None and now - self._probe_started < self.backoff:
+            # A probe is already out (or was abandoned without a result)
+            return False
+        if now - self._opened_at < self.backoff:
+            return False
+        self._probe_started = now
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self.backoff = self.initial_backoff
+        self._opened_at = None
+        self._probe_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self._probe_started is not None:
+            self.backoff = min(self.backoff * 2, self.max_backoff)
+            self._probe_started = None
+            self._opened_at = self._clock.monotonic()
+        elif self._opened_at is None and self.failures >= self.threshold:
+            self._opened_at = self._clock.monotonic()
@@ -0,0 +1,84 @@
+"""How long to leave the hub between forced refreshes, going by what it's doing."""
+from collections import deque
+import datetime
+
+# Hours, like refresh_interval
+DEFAULT_MIN_REFRESH_INTERVAL = 1
+DEFAULT_MAX_REFRESH_INTERVAL = 48
+DEFAULT_DAILY_REFRESH_CAP = 12
+# Keep a closer eye on the hub for this long after a command
+DEFAULT_COMMAND_WINDOW = datetime.timedelta(hours=1)
+
+_DAY = datetime.timedelta(days=1)
+
+
+class RefreshSchedule:
+    """Forced refresh interval that follows the hub's activity.
+
+    While a zone is heating or boosting, the burner is on, or a command
+    went out recently, the hub is asked every min_interval. Otherwise it
+    is asked every interval, stretched by factor for each refresh in a
+    row that found it idle, up to max_interval. However active the hub,
+    no more than daily_cap forced refreshes go out in any 24 hours.
+    Intervals are in seconds.
+    """
+
+    def __init__(
+        self,
+        interval,
+        min_interval=DEFAULT_MIN_REFRESH_INTERVAL * 3600,
+        max_interval=DEFAULT_MAX_REFRESH_INTERVAL * 3600,
+        daily_cap=DEFAULT_DAILY_REFRESH_CAP,
+        factor=1.5,
+        command_window=DEFAULT_COMMAND_WINDOW,
+    ):
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.daily_cap = daily_cap
+        self.factor = factor
+        self.command_window = command_window
+        self.idle_streak = 0
+        self.sent = deque()
+
+    def is_active(self, status, last_command, now):
+        """Whether there's something going on worth keeping up with"""
+        if last_command is not None and now - last_command < self.command_window:
+            return True
+        return any(zone.heating or zone.burner for zone in status.zones.values())
+
+    def current_interval(self, status, last_command, now):
+        """Seconds the status may get to before the hub is asked again"""
+        if self.is_active(status, last_command, now):
+            return self.min_interval
+        interval = max(self.min_interval, min(self.interval, self.max_interval))
+        return min(interval * self.factor**self.idle_streak, self.max_interval)
+
+    def capped(self, now):
+        """Whether today's forced refreshes are used up"""
+        while self.sent and now - self.sent[0] >= _DAY:
+            self.sent.popleft()
+        return len(self.sent) >= self.daily_cap
+
+    def due(self, age, status, last_command, now):
+        """Whether a status age seconds old calls for a forced refresh now
+
+        An age of None, nothing known yet, is always due unless capped.
+        """
+        if self.capped(now):
+            return False
+        return age is None or age >= self.current_interval(status, last_command, now)
+
+    def observe(self, status, last_command, now):
+        """Any sign of activity, from a cloud read or a command, ends an idle run"""
+        if self.is_active(status, last_command, now):
+            self.idle_streak = 0
+
+    def record(self, now, active=None):
+        """A forced refresh went out at now, finding the hub active or not
+
+        active is None if it never came back, which says nothing either way.
+        """
+        self.sent.append(now)
+        if active is not None:
+            self.idle_streak = 0 if active else self.idle_streak + 1
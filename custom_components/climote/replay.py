@@ -0,0 +1,250 @@
+"""Record Climote cloud traffic and play it back in place of the cloud.
+
+ReplaySession and RecordingSession both look enough like an
+aiohttp.ClientSession for ClimoteService, so the real login, polling
+and parsing code runs against a recording at recorded speed, scaled,
+or with no delay at all.
+
+A fixture holds the sanitized exchanges for each endpoint in the order
+they were recorded:
+
+    {"version": 1, "exchanges": {"login": [{"status": 200,
+      "elapsed": 0.41, "body": "..."}], ...}}
+
+elapsed is how long the request took. Status responses also keep
+after, how long after the forced get-status they came back, which is
+the SMS round trip. Until then the replay answers "0" like the cloud.
+"""
+from collections import Counter, defaultdict
+import functools
+import json
+import math
+from pathlib import Path
+import time
+
+from .clock import Clock
+from .login_parser import parse_login_page
+from .metrics import ClimoteMetrics
+
+FIXTURE_VERSION = 1
+DEFAULT_FIXTURE = Path(__file__).parent / "fixtures" / "replay.json"
+DEFAULT_REPLAY_SCALE = 1.0
+
+_FORCE = "get-status?force=1"
+_WAITING = "waiting-get-status-response"
+_STATUS_ENDPOINTS = {"get-status?force=0", _WAITING}
+_NOT_READY = "0"
+_TOKEN = "0123456789abcdef0123456789abcdef"
+_REDACTED = "REDACTED"
+
+
+def read_fixture(path=DEFAULT_FIXTURE):
+    """A fixture file's contents, read from disk only the first time"""
+    return _read_fixture(Path(path))
+
+
+@functools.lru_cache(maxsize=None)
+def _read_fixture(path):
+    return json.loads(path.read_text())
+
+
+class _Response:
+    def __init__(self, status, body):
+        self.status = status
+        self._body = body
+
+    async def text(self):
+        return self._body
+
+
+class _Replayed:
+    """The async context manager session.get()/post() hand back"""
+
+    def __init__(self, response, delay, clock):
+        self._response = response
+        self._delay = delay
+        self._clock = clock
+
+    async def __aenter__(self):
+        if self._delay:
+            await self._clock.sleep(self._delay)
+        return self._response
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class ReplaySession:
+    """Answers ClimoteService from a fixture instead of the cloud.
+
+    Each endpoint cycles through its recorded responses. Boosts and
+    thermostat changes sent to it are laid over the status responses
+    that follow, so commands look applied the way they would on a hub.
+    Once the hub has answered a forced refresh or a command, status
+    responses carry the time it did so on the session's clock, with
+    boosts counted down to then.
+    """
+
+    def __init__(self, fixture, scale=DEFAULT_REPLAY_SCALE, clock=None):
+        if fixture.get("version") != FIXTURE_VERSION:
+            raise ValueError(f"Unsupported replay fixture {fixture.get('version')}")
+        self.exchanges = fixture["exchanges"]
+        self.scale = scale
+        self._clock = clock or Clock()
+        self._next = Counter()
+        self._forced_at = None
+        self._applied = defaultdict(dict)
+        # Wall and monotonic time of the hub's last report
+        self._reported = None
+        self.closed = False
+
+    @classmethod
+    def load(cls, path=DEFAULT_FIXTURE, scale=DEFAULT_REPLAY_SCALE, clock=None):
+        """A replay of the fixture at path, which sessions share read-only"""
+        return cls(read_fixture(path), scale=scale, clock=clock)
+
+    def get(self, url, data=None, headers=None, timeout=None):
+        return self._request(url, data)
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        return self._request(url, data)
+
+    async def close(self):
+        self.closed = True
+
+    def _request(self, url, data):
+        endpoint = ClimoteMetrics.endpoint_name(url)
+        recorded = self.exchanges.get(endpoint)
+        if not recorded:
+            return _Replayed(_Response(404, ""), 0, self._clock)
+
+        exchange = recorded[self._next[endpoint] % len(recorded)]
+        delay = exchange.get("elapsed", 0) * self.scale
+        if endpoint == _FORCE:
+            self._forced_at = self._clock.monotonic()
+        elif endpoint == _WAITING:
+            after = exchange.get("after", 0) * self.scale
+            if (
+                self._forced_at is None
+                or self._clock.monotonic() - self._forced_at < after
+            ):
+                return _Replayed(_Response(200, _NOT_READY), delay, self._clock)
+            self._forced_at = None
+            self._report()
+        self._next[endpoint] += 1
+
+        body = exchange["body"]
+        if data and self._apply(data):
+            self._report()
+        if endpoint in _STATUS_ENDPOINTS and body != _NOT_READY:
+            body = self._overlay(body)
+        return _Replayed(_Response(exchange["status"], body), delay, self._clock)
+
+    def _report(self):
+        self._reported = (self._clock.now(), self._clock.monotonic())
+
+    def _apply(self, data):
+        """Take in any commands in data, returning whether there were some"""
+        applied = False
+        for key, value in data.items():
+            if key.startswith("zoneIds["):
+                self._applied[int(key[8:-1])]["boost_until"] = (
+                    self._clock.monotonic() + float(value) * 3600
+                )
+                applied = True
+            elif key.startswith("temp-set-input["):
+                self._applied[int(key[15:-1])]["thermostat"] = int(value)
+                applied = True
+        return applied
+
+    def _overlay(self, body):
+        if self._reported is None and not self._applied:
+            return body
+        data = json.loads(body)
+        reported = self._clock.monotonic()
+        if self._reported is not None:
+            wall, reported = self._reported
+            data["updated_at"] = data["unit_time"] = wall.strftime("%H:%M")
+        for zone_id, fields in self._applied.items():
+            zone = data.setdefault(f"zone{zone_id}", {})
+            if "thermostat" in fields:
+                zone["thermostat"] = fields["thermostat"]
+            if "boost_until" in fields:
+                remaining = fields["boost_until"] - reported
+                zone["status"] = "5" if remaining > 0 else None
+                zone["timeRemaining"] = max(0, math.ceil(remaining / 60))
+        return json.dumps(data)
+
+
+class _Recording:
+    """Wraps one aiohttp request context so its exchange gets recorded"""
+
+    def __init__(self, recorder, url, request):
+        self._recorder = recorder
+        self._url = url
+        self._request = request
+
+    async def __aenter__(self):
+        started = time.monotonic()
+        response = await self._request.__aenter__()
+        # aiohttp keeps the body, ClimoteService can read it again
+        body = await response.text()
+        self._recorder.record(self._url, response.status, body, started)
+        return response
+
+    async def __aexit__(self, *exc):
+        return await self._request.__aexit__(*exc)
+
+
+class RecordingSession:
+    """Passes requests through to a real session and keeps a fixture of them.
+
+    Tokens, and any of the given secrets (passcode, username, password)
+    found in a body, are replaced before anything is kept. Empty status
+    polls aren't kept, the time the real answer took is.
+    """
+
+    def __init__(self, session, secrets=()):
+        self._session = session
+        # Anything shorter would match all over the page
+        self._secrets = [s for s in secrets if s and len(s) >= 4]
+        self.exchanges = defaultdict(list)
+        self._forced_at = None
+
+    def get(self, url, **kwargs):
+        return _Recording(self, url, self._session.get(url, **kwargs))
+
+    def post(self, url, **kwargs):
+        return _Recording(self, url, self._session.post(url, **kwargs))
+
+    async def close(self):
+        await self._session.close()
+
+    def record(self, url, status, body, started):
+        now = time.monotonic()
+        endpoint = ClimoteMetrics.endpoint_name(url)
+        exchange = {"status": status, "elapsed": round(now - started, 3)}
+        if endpoint == _FORCE:
+            self._forced_at = started
+        elif endpoint == _WAITING:
+            if body == _NOT_READY:
+                return
+            if self._forced_at is not None:
+                exchange["after"] = round(now - self._forced_at, 3)
+                self._forced_at = None
+        exchange["body"] = self._sanitize(body)
+        self.exchanges[endpoint].append(exchange)
+
+    def _sanitize(self, body):
+        token, _ = parse_login_page(body) if "<input" in body else (None, None)
+        if token:
+            body = body.replace(token, _TOKEN)
+        for secret in self._secrets:
+            body = body.replace(secret, _REDACTED)
+        return body
+
+    def fixture(self):
+        return {"version": FIXTURE_VERSION, "exchanges": dict(self.exchanges)}
+
+    def save(self, path):
+        Path(path).write_text(json.dumps(self.fixture(), indent=1) + "\n")
@@ -0,0 +1,191 @@
+"""Typed model of the heating schedule returned by get-heating-schedule."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import datetime
+import io
+
+from lxml import etree as ET
+
+# Only zoneInfo is read by the integration today. The weekly programme is
+# expected as <schedule><zone><day><period><start/><end/>, Monday first.
+_ZONE_INFO = "zoneInfo"
+_SCHEDULE = "schedule"
+_ZONE = "zone"
+_DAY = "day"
+_PERIOD = "period"
+_KEEP = {"active", "label", "start", "end"}
+
+
+@dataclass(frozen=True, slots=True)
+class Period:
+    start: datetime.time
+    end: datetime.time
+
+    @property
+    def overnight(self) -> bool:
+        return self.end < self.start
+
+    def contains(self, when: datetime.time) -> bool:
+        """Whether when falls in this period on the day it starts"""
+        if self.overnight:
+            return when >= self.start
+        return self.start <= when < self.end
+
+    def carries_over(self, when: datetime.time) -> bool:
+        """Whether when falls in this period on the day after it starts"""
+        return self.overnight and when < self.end
+
+
+@dataclass(frozen=True, slots=True)
+class Day:
+    weekday: int
+    periods: tuple[Period, ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class Zone:
+    zone_id: int
+    label: str
+    active: bool
+    days: tuple[Day, ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class HeatingSchedule:
+    zones: tuple[Zone, ...]
+
+    def active_zones(self) -> dict[int, str]:
+        """Zone id to label for the zones the hub has switched on"""
+        return {zone.zone_id: zone.label for zone in self.zones if zone.active}
+
+    def zone(self, zone_id) -> Zone | None:
+        for zone in self.zones:
+            if zone.zone_id == zone_id:
+                return zone
+        return None
+
+    def as_dict(self) -> dict:
+        """JSON friendly form, see from_dict"""
+        return {
+            "zones": [
+                {
+                    "zone_id": zone.zone_id,
+                    "label": zone.label,
+                    "active": zone.active,
+                    "days": [
+                        [
+                            [_format_time(period.start), _format_time(period.end)]
+                            for period in day.periods
+                        ]
+                        for day in zone.days
+                    ],
+                }
+                for zone in self.zones
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> HeatingSchedule:
+        return cls(
+            tuple(
+                Zone(
+                    zone_id=zone["zone_id"],
+                    label=zone["label"],
+                    active=zone["active"],
+                    days=tuple(
+                        Day(
+                            weekday,
+                            tuple(
+                                Period(_parse_time(start), _parse_time(end))
+                                for start, end in periods
+                            ),
+                        )
+                        for weekday, periods in enumerate(zone["days"])
+                    ),
+                )
+                for zone in data["zones"]
+            )
+        )
+
+    def period_active_at(self, zone_id, when: datetime.datetime) -> Period | None:
+        """The programmed period covering when for a zone, if any"""
+        zone = self.zone(zone_id)
+        if zone is None:
+            return None
+        weekday = when.weekday()
+        for day in zone.days:
+            for period in day.periods:
+                if day.weekday == weekday and period.contains(when.time()):
+                    return period
+                if day.weekday == (weekday - 1) % 7 and period.carries_over(
+                    when.time()
+                ):
+                    return period
+        return None
+
+
+def parse_schedule(content: bytes) -> HeatingSchedule:
+    """Build a HeatingSchedule in one pass over the XML
+
+    Elements we don't model are cleared as soon as they close, so large
+    unused parts of the document never stay in memory.
+    """
+    labels = []
+    programmes = []
+    path = []
+    fields = {}
+    days = []
+    periods = []
+
+    for event, element in ET.iterparse(io.BytesIO(content), events=("start", "end")):
+        tag = element.tag
+        if event == "start":
+            path.append(tag)
+            continue
+
+        path.pop()
+        parent = path[-1] if path else None
+        if tag in _KEEP:
+            fields[tag] = (element.text or "").strip()
+        elif tag == _ZONE and parent == _ZONE_INFO:
+            labels.append((fields.get("label", ""), fields.get("active") == "1"))
+            fields = {}
+        elif tag == _PERIOD:
+            if "start" in fields and "end" in fields:
+                periods.append(
+                    Period(_parse_time(fields["start"]), _parse_time(fields["end"]))
+                )
+            fields = {}
+        elif tag == _DAY:
+            days.append(Day(len(days), tuple(periods)))
+            periods = []
+        elif tag == _ZONE and parent == _SCHEDULE:
+            programmes.append(tuple(days))
+            days = []
+        element.clear(keep_tail=False)
+
+    return HeatingSchedule(
+        tuple(
+            Zone(
+                zone_id=i,
+                label=label,
+                active=active,
+                days=programmes[i - 1] if i <= len(programmes) else (),
+            )
+            for i, (label, active) in enumerate(labels, start=1)
+        )
+    )
+
+
+def _parse_time(value: str) -> datetime.time:
+    hours, minutes = value.split(":")[:2]
+    if hours == "24":
+        return datetime.time.max
+    return datetime.time(int(hours), int(minutes))
+
+
+def _format_time(value: datetime.time) -> str:
+    if value == datetime.time.max:
+        return "24:00"
+    return value.strftime("%H:%M")
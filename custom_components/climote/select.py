@@ -5,6 +5,7 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.components.select import SelectEntity
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -20,14 +21,15 @@ async def async_setup_entry(
         f"2. async_setup_entry UniqueID [{entry.unique_id}] Data [{entry.entry_id}]"
     )
 
-    climotesvc = hass.data[DOMAIN][entry.entry_id]
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    climotesvc = coordinator.climote
 
     entities = []
     if not climotesvc.zones:
         raise Exception("There should have been zones by now")
 
     for zone_id, region in climotesvc.zones.items():
-        entities.append(BoostDuration(climotesvc, zone_id, region))
+        entities.append(BoostDuration(coordinator, zone_id, region))
     _LOGGER.info("3. Found entities %s", entities)
 
     add_entities(entities)
@@ -35,7 +37,7 @@ async def async_setup_entry(
 
 
 # Could have also used a select entity with predefined durations
-class BoostDuration(SelectEntity):
+class BoostDuration(CoordinatorEntity, SelectEntity):
     """Representation of how long the boost time is for a zone."""
 
     _attr_icon = "mdi:clock"
@@ -52,13 +54,14 @@ class BoostDuration(SelectEntity):
         self._climote.setZoneBoostTime(self._zoneid, option)
         self.cur_select = option
 
-    def __init__(self, climote_service, zone_id, name):
+    def __init__(self, coordinator, zone_id, name):
         """Initialize the thermostat."""
+        super().__init__(coordinator)
         _LOGGER.info(
             "Initialize Climote Select Entity %s - %s - %s"
-            % (climote_service.device_id, zone_id, name)
+            % (coordinator.climote.device_id, zone_id, name)
         )
-        self._climote = climote_service
+        self._climote = coordinator.climote
         self._zoneid = zone_id
         self._name = f"climote_{self._climote.get_sanitized_device_id()}_{name}"
         self._unique_id = f"climote_select_{self._climote.device_id}_{self._zoneid}"
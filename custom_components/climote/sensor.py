@@ -4,15 +4,32 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.const import UnitOfTime
+from homeassistant.helpers.entity import EntityCategory
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-import datetime
-from datetime import timedelta
-import time
 import math
 
 _LOGGER = logging.getLogger(__name__)
 
+# Metrics endpoint names and the keys their latency sensors go by
+ENDPOINTS = {
+    "login": "login",
+    "logout": "logout",
+    "get-status?force=0": "cloud_status",
+    "get-status?force=1": "force_status",
+    "waiting-get-status-response": "status_poll",
+    "boost": "boost",
+    "temperature": "temperature",
+    "get-heating-schedule": "schedule",
+}
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -25,24 +42,29 @@ async def async_setup_entry(
         f"2. async_setup_entry UniqueID [{entry.unique_id}] Data [{entry.entry_id}]"
     )
 
-    climotesvc = hass.data[DOMAIN][entry.entry_id]
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    climotesvc = coordinator.climote
 
     entities = []
     if not climotesvc.zones:
         raise Exception("There should have been zones by now")
 
     for zone_id, region in climotesvc.zones.items():
-        entities.append(BoostRemaining(climotesvc, zone_id, region))
+        entities.append(BoostRemaining(coordinator, zone_id, region))
+    entities.append(LastRefresh(coordinator))
+    entities.append(Relogins(coordinator))
+    entities.append(PollIterations(coordinator))
+    entities.append(DataAge(coordinator))
+    for endpoint, key in ENDPOINTS.items():
+        entities.append(EndpointLatency(coordinator, endpoint, key))
     _LOGGER.info("3. Found entities %s", entities)
 
     add_entities(entities)
     return True
 
 
-SCAN_INTERVAL = timedelta(minutes=1)
-
 # Could have also used a select entity with predefined durations
-class BoostRemaining(SensorEntity):
+class BoostRemaining(CoordinatorEntity, SensorEntity):
     """Representation of how long the boost time is for a zone."""
 
     _attr_icon = "mdi:clock"
@@ -52,67 +74,119 @@ class BoostRemaining(SensorEntity):
     # Intentionally None
     _attr_state_class = None
 
-    def __init__(self, climote_service, zone_id, name):
+    def __init__(self, coordinator, zone_id, name):
         """Initialize the thermostat."""
+        super().__init__(coordinator)
         _LOGGER.info(
             "Initialize Climote Sensor Entity %s - %s - %s"
-            % (climote_service.device_id, zone_id, name)
+            % (coordinator.climote.device_id, zone_id, name)
         )
-        self._climote = climote_service
+        self._climote = coordinator.climote
         self._zoneid = zone_id
         self._name = f"climote_{self._climote.get_sanitized_device_id()}_{name}"
         self._unique_id = f"climote_sensor_{self._climote.device_id}_{self._zoneid}"
         self.measurement = 0
+        self._counted_from = None
+        self._boost_ends = None
+        self._unsub_tick = None
+        self._update_measurement()
+
+    @property
+    def available(self) -> bool:
+        """Nothing to show until the hub has reported at least once."""
+        return super().available and self._climote.has_status
 
     @property
     def native_value(self) -> float:
         """Return value of number."""
         return self.measurement
 
-    async def async_update(self):
-        # These dont really have timezones, they also may not be times as the device time
-        # Could be different to real time. Instead they're more like "how old is the info from the device?"
-        # Not a "how old is the info compared to now". Not safe to assume that unit_time ~ now but thats what i'll do anyway
-        zone_data = self._climote.data.get("zone" + str(self._zoneid), {})
-        unit_burn_time_remaining = zone_data.get("timeRemaining", None)
-        # unit_burn_time_remaining = 50
+    async def async_added_to_hass(self) -> None:
+        """Start counting down if the zone is already boosting."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._cancel_tick)
+        self._schedule_tick()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Recalculate the remaining boost from the new hub status."""
+        self._update_measurement()
+        self._schedule_tick()
+        super()._handle_coordinator_update()
+
+    @callback
+    def _tick(self) -> None:
+        self._unsub_tick = None
+        self._update_measurement()
+        self._schedule_tick()
+        self.async_write_ha_state()
+
+    def _schedule_tick(self):
+        """Wake up when the countdown next drops a minute, only while boosting"""
+        self._cancel_tick()
+        if not self.measurement:
+            return
+        remaining = (self._boost_ends - self._climote.clock.now()).total_seconds()
+        self._unsub_tick = self._climote.clock.call_later(
+            remaining - (self.measurement - 1) * 60, self._tick
+        )
+
+    def _cancel_tick(self):
+        if self._unsub_tick is not None:
+            self._unsub_tick.cancel()
+            self._unsub_tick = None
+
+    def _update_measurement(self):
+        # The end only moves when a new status comes in, in between it's
+        # just counting down to it
+        counted_from = (self._climote.status, self._climote.last_update_complete)
+        if counted_from != self._counted_from:
+            self._counted_from = counted_from
+            self._boost_ends = self._climote.boost_ends(self._zoneid)
 
-        if not unit_burn_time_remaining:
+        if self._boost_ends is None:
             self.measurement = None
             return
+        remaining = (self._boost_ends - self._climote.clock.now()).total_seconds()
+        # Whole minutes rounded up, like the hub's own timeRemaining
+        self.measurement = math.ceil(remaining / 60) if remaining > 0 else None
+
+    @property
+    def name(self):
+        """Return the name of the thermostat."""
+        return self._name
+
+    @property
+    def unique_id(self):
+        """Return unique ID for this device."""
+        return self._unique_id
 
-        # Very naive to just do as we dont know when the unit time is from
-        # especially if we're only polling > 1 hour, this number wont change
-        # And the device may not be syncing too
-        # self.measurement = unit_burn_time_remaining
-
-        # Instead I should workout a 'unit_offset' and a 'polling_interval_offset'
-        # unit_offset
-        # unit_updated goes ahead e.g. 16.02 vs 16.00
-        unit_updated = self._climote.data.get("updated_at", None)
-        unit_time = self._climote.data.get("unit_time", None)
-
-        # TODO incomplete and what if it goes past mightnight?
-        unit_updated_obj = time.strptime(unit_updated, "%H:%M")
-        unit_time_obj = time.strptime(unit_time, "%H:%M")
-
-        unit_offset = 0  # TOOD unit_time - unit_updated
-
-        # polling_interval_offset
-        last_data_retrieval = self._climote.seconds_since_update
-        if last_data_retrieval is None:
-            last_data_retrieval = 1
-        # Floor version
-        # polling_interval_offset = last_data_retrieval // 60
-        polling_interval_offset = round(math.ceil(last_data_retrieval / 60), 2)
-
-        self.measurement = unit_burn_time_remaining - (
-            unit_offset + polling_interval_offset
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return the device info."""
+        return DeviceInfo(
+            identifiers={(DOMAIN, self._climote.device_id)},
+            name="Climote Hub",
+            manufacturer="Climote",
+            model="Remote Heating Controller",
         )
 
+
+class HubDiagnosticSensor(CoordinatorEntity, SensorEntity):
+    """Something ClimoteService measured about the hub as a whole."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, coordinator, key):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._climote = coordinator.climote
+        self._name = f"climote_{self._climote.get_sanitized_device_id()}_{key}"
+        self._unique_id = f"climote_{key}_{self._climote.device_id}"
+
     @property
     def name(self):
-        """Return the name of the thermostat."""
+        """Return the name of the sensor."""
         return self._name
 
     @property
@@ -120,6 +194,11 @@ class BoostRemaining(SensorEntity):
         """Return unique ID for this device."""
         return self._unique_id
 
+    @property
+    def available(self) -> bool:
+        """Most useful exactly when refreshes are failing."""
+        return True
+
     @property
     def device_info(self) -> DeviceInfo:
         """Return the device info."""
@@ -129,3 +208,130 @@ class BoostRemaining(SensorEntity):
             manufacturer="Climote",
             model="Remote Heating Controller",
         )
+
+
+class LastRefresh(HubDiagnosticSensor):
+    """When a status last came back from the hub or the cloud."""
+
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+
+    def __init__(self, coordinator):
+        """Initialize the sensor."""
+        super().__init__(coordinator, "last_refresh")
+
+    @property
+    def native_value(self):
+        """Return the local time of the last status."""
+        last_success = self._climote.metrics.last_success
+        return last_success.astimezone() if last_success else None
+
+
+class Relogins(HubDiagnosticSensor):
+    """How often the cloud session expired and had to be logged in again."""
+
+    _attr_icon = "mdi:login"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    def __init__(self, coordinator):
+        """Initialize the sensor."""
+        super().__init__(coordinator, "relogins")
+
+    @property
+    def native_value(self):
+        """Return the number of re-logins."""
+        return self._climote.metrics.relogins
+
+
+class PollIterations(HubDiagnosticSensor):
+    """How many polls the last forced refresh took before the hub answered."""
+
+    _attr_icon = "mdi:message-processing"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, coordinator):
+        """Initialize the sensor."""
+        super().__init__(coordinator, "poll_iterations")
+
+    @property
+    def native_value(self):
+        """Return the polls in the last forced refresh."""
+        return self._climote.metrics.last_poll_iterations
+
+    @property
+    def extra_state_attributes(self):
+        """Return the refresh counters."""
+        metrics = self._climote.metrics
+        return {
+            "refreshes": metrics.refreshes,
+            "refresh_timeouts": metrics.refresh_timeouts,
+            "p95": metrics.poll_iterations.percentile(95),
+        }
+
+
+class DataAge(HubDiagnosticSensor):
+    """How long ago the hub reported the status we hold, by our clock."""
+
+    _attr_icon = "mdi:clock-alert-outline"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, coordinator):
+        """Initialize the sensor."""
+        super().__init__(coordinator, "data_age")
+
+    @property
+    def native_value(self):
+        """Return the age of the hub's last report."""
+        data_age = self._climote.data_age()
+        return round(data_age) if data_age is not None else None
+
+    @property
+    def extra_state_attributes(self):
+        """Return how far ahead of ours the hub and cloud clocks are."""
+        hub_clock = self._climote.hub_clock
+        return {
+            "hub_clock_offset": round(hub_clock.hub_offset),
+            "cloud_clock_offset": round(hub_clock.cloud_offset),
+            "offset_samples": len(hub_clock.hub_offsets),
+            # Straight from the last report, in minutes
+            "hub_cloud_skew": self._climote.status.unit_offset(),
+        }
+
+
+class EndpointLatency(HubDiagnosticSensor):
+    """Mean latency of one cloud endpoint, with its call counts."""
+
+    _attr_icon = "mdi:timer-outline"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 2
+    # One per endpoint per hub is a lot, turn on the ones you're tuning
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator, endpoint, key):
+        """Initialize the sensor."""
+        super().__init__(coordinator, f"{key}_latency")
+        self._endpoint = endpoint
+
+    @property
+    def native_value(self):
+        """Return the mean latency so far."""
+        stats = self._climote.metrics.endpoints.get(self._endpoint)
+        return stats.latency.mean if stats else None
+
+    @property
+    def extra_state_attributes(self):
+        """Return the counters and percentiles."""
+        stats = self._climote.metrics.endpoints.get(self._endpoint)
+        if stats is None:
+            return {"calls": 0, "failures": 0, "timeouts": 0}
+        return {
+            "calls": stats.calls,
+            "failures": stats.failures,
+            "timeouts": stats.timeouts,
+            "p50": stats.latency.percentile(50),
+            "p95": stats.latency.percentile(95),
+            "max": stats.latency.max,
+        }
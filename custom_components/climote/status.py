@@ -0,0 +1,117 @@
+"""Typed snapshot of the JSON the hub reports its status with."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+import datetime
+
+# zoneN.status while the zone is boosting/heating
+_STATUS_ON = "5"
+_MINUTES_PER_DAY = 24 * 60
+# Status times are only a time of day. Taken as at most this far ahead
+# of now, anything later is from the day before
+_AHEAD = datetime.timedelta(hours=4)
+
+
+@dataclass(frozen=True, slots=True)
+class ZoneStatus:
+    zone_id: int
+    heating: bool = False
+    burner: bool = False
+    temperature: int = 0
+    thermostat: int = 0
+    # Minutes of boost left when the hub reported, None when not boosting
+    time_remaining: int | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class HubStatus:
+    zones: dict[int, ZoneStatus] = field(default_factory=dict)
+    holiday: str | None = None
+    hold: str | None = None
+    # Clock readings with no date or timezone. updated_at is the cloud's
+    # clock when the report arrived, unit_time the hub's when it sent it
+    updated_at: datetime.time | None = None
+    unit_time: datetime.time | None = None
+
+    def zone(self, zone_id) -> ZoneStatus:
+        zone = self.zones.get(zone_id)
+        if zone is None:
+            return ZoneStatus(zone_id)
+        return zone
+
+    def unit_offset(self) -> int:
+        """Minutes the hub's clock was ahead of the cloud's for this report
+
+        Both are times of day, so 23:58 to 00:01 is 3 minutes ahead and
+        00:01 to 23:58 is 3 behind.
+        """
+        if self.updated_at is None or self.unit_time is None:
+            return 0
+        offset = (_minutes(self.unit_time) - _minutes(self.updated_at)) % (
+            _MINUTES_PER_DAY
+        )
+        return offset - _MINUTES_PER_DAY if offset > _MINUTES_PER_DAY // 2 else offset
+
+    def with_zone(self, zone_id, **changes) -> HubStatus:
+        """A copy with some fields of one zone changed"""
+        zones = dict(self.zones)
+        zones[zone_id] = replace(self.zone(zone_id), **changes)
+        return replace(self, zones=zones)
+
+
+def parse_status(data: dict) -> HubStatus:
+    """Decode a waiting-get-status-response / get-status payload"""
+    zones = {}
+    for key, value in data.items():
+        if not key.startswith("zone") or not isinstance(value, dict):
+            continue
+        zone_id = int(key[4:])
+        zones[zone_id] = ZoneStatus(
+            zone_id=zone_id,
+            heating=value.get("status") == _STATUS_ON,
+            burner=bool(_to_int(value.get("burner"))),
+            temperature=_to_int(value.get("temperature")),
+            thermostat=_to_int(value.get("thermostat")),
+            time_remaining=_to_int(value.get("timeRemaining")) or None,
+        )
+    return HubStatus(
+        zones=zones,
+        holiday=data.get("holiday"),
+        hold=data.get("hold"),
+        updated_at=_to_time(data.get("updated_at")),
+        unit_time=_to_time(data.get("unit_time")),
+    )
+
+
+def _to_int(value) -> int:
+    # Missing readings come back as "--", null or false
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def place_time(
+    value: datetime.time,
+    now: datetime.datetime,
+    ahead: datetime.timedelta = _AHEAD,
+) -> datetime.datetime:
+    """value on the day that makes it the latest time at most ahead after now"""
+    placed = datetime.datetime.combine(now.date(), value)
+    if placed > now + ahead:
+        placed -= datetime.timedelta(days=1)
+    elif placed <= now + ahead - datetime.timedelta(days=1):
+        placed += datetime.timedelta(days=1)
+    return placed
+
+
+def _minutes(value: datetime.time) -> int:
+    return value.hour * 60 + value.minute
+
+
+def _to_time(value) -> datetime.time | None:
+    try:
+        hours, minutes = value.split(":")
+        return datetime.time(int(hours), int(minutes))
+    except (AttributeError, ValueError):
+        return None
@@ -0,0 +1,6 @@
+"""Tests for the Climate Climote integration.
+
+Run from the repository root, with Home Assistant installed:
+
+    python -m pytest tests
+"""
@@ -0,0 +1,70 @@
+"""Tests for ClimoteService against the test mode replay."""
+import asyncio
+import datetime
+import logging
+
+import pytest
+
+from custom_components.climote.climote_service_stub import ClimoteService
+from custom_components.climote.clock import SimulatedClock
+
+_LOGGER = logging.getLogger(__name__)
+_START = datetime.datetime(2024, 1, 1)
+
+
+def _service(clock=None, **kwargs):
+    return ClimoteService(
+        "1234567",
+        "user@example.com",
+        "password",
+        _LOGGER,
+        refresh_interval=12,
+        default_boost_duration="1.0",
+        clock=clock or SimulatedClock(),
+        **kwargs,
+    )
+
+
+async def _run(svc, coro, seconds=300):
+    """Await coro while moving the service's clock on far enough for it"""
+    task = asyncio.get_running_loop().create_task(coro)
+    await svc.clock.advance(seconds)
+    return await task
+
+
+def test_failed_forced_refresh_counts_towards_the_cap():
+    async def run():
+        svc = _service()
+        assert await _run(svc, svc.initialize())
+        for _ in range(svc.breaker.threshold):
+            svc.breaker.record_failure()
+        with pytest.raises(ClimoteService.TimeoutException):
+            await _run(svc, svc.updateStatus(True))
+        assert len(svc.refresh_schedule.sent) == 1
+        assert not svc.forced_refresh_due()
+
+    asyncio.run(run())
+
+
+def _restarted(snapshot, days):
+    """A service started days after the one that took snapshot"""
+    svc = _service(clock=SimulatedClock(_START + datetime.timedelta(days=days)))
+    assert svc.restore(snapshot)
+    return svc
+
+
+def test_restored_status_keeps_its_age():
+    async def run():
+        svc = _service(clock=SimulatedClock(_START))
+        assert await _run(svc, svc.initialize())
+        assert await _run(svc, svc.updateStatus(True))
+        snapshot = svc.snapshot()
+        restarted = _restarted(snapshot, 2)
+        age = restarted.data_age()
+        assert 2 * 86400 - 600 < age <= 2 * 86400
+        assert restarted.forced_refresh_due()
+        # Saved before the report time was
+        snapshot["reported"] = None
+        assert _restarted(snapshot, 2).data_age() >= age
+
+    asyncio.run(run())
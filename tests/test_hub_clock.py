@@ -0,0 +1,107 @@
+"""Tests for the hub and cloud clock offsets."""
+import datetime
+
+from custom_components.climote.hub_clock import HubClock
+from custom_components.climote.status import HubStatus
+
+_RECEIVED = datetime.datetime(2024, 1, 1, 12, 0, 30)
+
+
+def _status(updated_at=None, unit_time=None):
+    return HubStatus(updated_at=updated_at, unit_time=unit_time)
+
+
+def test_fresh_status_gives_the_offsets():
+    hub_clock = HubClock()
+    hub_clock.record(
+        _status(datetime.time(12, 3), datetime.time(11, 58)), _RECEIVED, fresh=True
+    )
+    assert hub_clock.cloud_offset == 180
+    assert hub_clock.hub_offset == -120
+    assert hub_clock.reported == _RECEIVED
+
+
+def test_cached_status_leaves_the_offsets():
+    hub_clock = HubClock()
+    hub_clock.record(_status(datetime.time(9, 0)), _RECEIVED, fresh=False)
+    assert hub_clock.cloud_offset == 0.0
+    assert hub_clock.reported == datetime.datetime(2024, 1, 1, 9, 0, 30)
+
+
+def test_offsets_across_midnight():
+    hub_clock = HubClock()
+    received = datetime.datetime(2024, 1, 1, 23, 59, 30)
+    hub_clock.record(_status(datetime.time(0, 2)), received, fresh=True)
+    assert hub_clock.cloud_offset == 180
+
+
+def test_median_ignores_an_odd_reading():
+    hub_clock = HubClock()
+    for minute in (3, 3, 50, 3):
+        hub_clock.record(_status(datetime.time(12, minute)), _RECEIVED, fresh=True)
+    assert hub_clock.cloud_offset == 180
+
+
+def test_to_local_takes_off_the_offset():
+    hub_clock = HubClock()
+    hub_clock.record(_status(datetime.time(12, 3)), _RECEIVED, fresh=True)
+    # Reported by the cloud's clock at 14:03, which was 14:00 for us
+    assert hub_clock.to_local(
+        _status(datetime.time(14, 3)), datetime.datetime(2024, 1, 1, 15, 0)
+    ) == datetime.datetime(2024, 1, 1, 14, 0, 30)
+
+
+def test_unit_time_without_updated_at():
+    hub_clock = HubClock()
+    hub_clock.record(_status(unit_time=datetime.time(9, 0)), _RECEIVED, fresh=False)
+    assert hub_clock.reported == datetime.datetime(2024, 1, 1, 9, 0, 30)
+
+
+def test_data_age():
+    hub_clock = HubClock()
+    assert hub_clock.data_age(_RECEIVED) is None
+    hub_clock.record(_status(datetime.time(12, 0)), _RECEIVED, fresh=True)
+    assert hub_clock.data_age(_RECEIVED + datetime.timedelta(hours=2)) == 7200
+
+
+def test_same_report_keeps_its_age_past_a_day():
+    hub_clock = HubClock()
+    hub_clock.record(_status(datetime.time(12, 0)), _RECEIVED, fresh=True)
+    # The cloud keeps handing back its copy while the hub stays quiet
+    for hours in range(1, 31):
+        now = _RECEIVED + datetime.timedelta(hours=hours)
+        hub_clock.record(_status(datetime.time(12, 0)), now, fresh=False)
+        assert hub_clock.data_age(now) == hours * 3600
+
+
+def test_new_report_from_the_cloud_is_placed_again():
+    hub_clock = HubClock()
+    hub_clock.record(_status(datetime.time(12, 0)), _RECEIVED, fresh=True)
+    later = _RECEIVED + datetime.timedelta(hours=5)
+    hub_clock.record(_status(datetime.time(16, 0)), later, fresh=False)
+    assert hub_clock.reported == datetime.datetime(2024, 1, 1, 16, 0, 30)
+
+
+def test_day_old_cloud_copy_is_not_placed_in_the_future():
+    hub_clock = HubClock()
+    hub_clock.record(_status(datetime.time(12, 0)), _RECEIVED, fresh=True)
+    # First seen 21 hours after the hub reported, 3 hours short of a day
+    later = _RECEIVED + datetime.timedelta(hours=25)
+    hub_clock.record(_status(datetime.time(16, 0)), later, fresh=False)
+    assert hub_clock.reported == datetime.datetime(2024, 1, 1, 16, 0, 30)
+    assert hub_clock.data_age(later) == 21 * 3600
+
+
+def test_cloud_copy_a_little_ahead_is_placed_at_received():
+    hub_clock = HubClock()
+    hub_clock.record(_status(datetime.time(12, 0)), _RECEIVED, fresh=True)
+    later = _RECEIVED + datetime.timedelta(hours=1)
+    hub_clock.record(_status(datetime.time(13, 2)), later, fresh=False)
+    assert hub_clock.reported == later
+
+
+def test_fresh_reading_off_the_median_stays_today():
+    hub_clock = HubClock()
+    for minute in (3, 3, 50):
+        hub_clock.record(_status(datetime.time(12, minute)), _RECEIVED, fresh=True)
+    assert hub_clock.reported == _RECEIVED
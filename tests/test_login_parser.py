@@ -0,0 +1,35 @@
+"""Tests for reading the token and schedule id off the manager page."""
+from custom_components.climote.login_parser import parse_login_page
+
+_PAGE = (
+    "<html><body><form>"
+    '<input type="hidden" {attrs}>'
+    '<input type="text" name="other" value="wrong">'
+    "</form>"
+    '<a href="/manager/edit-heating-schedule?heatingScheduleId=100000">'
+    "Schedule</a></body></html>"
+)
+
+
+def _page(attrs):
+    return _PAGE.format(attrs=attrs)
+
+
+def test_token_and_schedule_id():
+    page = _page('name="cs_token_rf" value="abc123"')
+    assert parse_login_page(page) == ("abc123", "100000")
+
+
+def test_single_quoted_and_bare_values():
+    assert parse_login_page(_page("value='abc123'"))[0] == "abc123"
+    assert parse_login_page(_page("value=abc123"))[0] == "abc123"
+
+
+def test_data_value_is_not_the_token():
+    page = _page('data-value="decoy" name="cs_token_rf" value="abc123"')
+    assert parse_login_page(page)[0] == "abc123"
+
+
+def test_login_form_has_no_schedule_id():
+    page = '<form><input type="text" name="username"></form>'
+    assert parse_login_page(page) == (None, None)
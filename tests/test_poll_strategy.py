@@ -0,0 +1,50 @@
+"""Tests for the waiting-get-status-response poll timing."""
+from custom_components.climote.poll_strategy import PollStrategy
+
+
+class _FakeTime:
+    """A monotonic clock that moves by however long the last delay was"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _delays(strategy):
+    time = _FakeTime()
+    delays = []
+    for delay in strategy.delays(time):
+        delays.append(delay)
+        time.now += delay
+    return delays
+
+
+def test_delays_fit_in_the_timeout():
+    delays = _delays(PollStrategy(timeout=120))
+    assert sum(delays) == 120
+    assert delays[0] == 2.0
+
+
+def test_delays_grow_up_to_the_jittered_cap():
+    strategy = PollStrategy(timeout=600, cap=15.0, jitter=0.25)
+    delays = _delays(strategy)
+    assert delays[1] > delays[0]
+    assert max(delays) <= 15.0 * 1.25
+
+
+def test_first_delay_learns_from_past_responses():
+    strategy = PollStrategy(timeout=120)
+    strategy.record(20.0)
+    strategy.record(22.0)
+    assert strategy.first_delay() == strategy.initial
+    strategy.record(24.0)
+    assert strategy.initial < strategy.first_delay() < 20.0
+
+
+def test_first_delay_never_passes_the_timeout():
+    strategy = PollStrategy(timeout=10)
+    for latency in (60.0, 70.0, 80.0):
+        strategy.record(latency)
+    assert strategy.first_delay() == 10
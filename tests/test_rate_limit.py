@@ -0,0 +1,81 @@
+"""Tests for the token bucket and circuit breaker."""
+import asyncio
+
+from custom_components.climote.clock import SimulatedClock
+from custom_components.climote.rate_limit import CircuitBreaker, TokenBucket
+
+
+def _advance(clock, seconds):
+    asyncio.run(clock.advance(seconds))
+
+
+def test_bucket_allows_a_burst_then_the_rate():
+    bucket = TokenBucket(rate=2.0, burst=3, clock=SimulatedClock())
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    # Each caller after the burst waits half a second behind the one before
+    assert [bucket.reserve() for _ in range(3)] == [0.5, 1.0, 1.5]
+
+
+def test_bucket_refills_up_to_the_burst():
+    clock = SimulatedClock()
+    bucket = TokenBucket(rate=1.0, burst=2, clock=clock)
+    bucket.reserve()
+    bucket.reserve()
+    _advance(clock, 60)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 1.0]
+
+
+def test_acquire_sleeps_on_the_clock():
+    async def run():
+        clock = SimulatedClock()
+        bucket = TokenBucket(rate=1.0, burst=1, clock=clock)
+        await bucket.acquire()
+        second = asyncio.get_running_loop().create_task(bucket.acquire())
+        await clock.advance(0.5)
+        assert not second.done()
+        await clock.advance(0.5)
+        assert second.done()
+
+    asyncio.run(run())
+
+
+def test_breaker_opens_after_threshold_failures():
+    clock = SimulatedClock()
+    breaker = CircuitBreaker(threshold=3, backoff=10, clock=clock)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.is_open
+    assert not breaker.allow()
+    assert breaker.retry_in() == 10
+
+
+def test_breaker_lets_one_probe_through_and_backs_off():
+    clock = SimulatedClock()
+    breaker = CircuitBreaker(threshold=1, backoff=10, max_backoff=30, clock=clock)
+    breaker.record_failure()
+    _advance(clock, 10)
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.backoff == 20
+    _advance(clock, 10)
+    assert not breaker.allow()
+    _advance(clock, 10)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.backoff == 30
+
+
+def test_breaker_closes_on_success():
+    clock = SimulatedClock()
+    breaker = CircuitBreaker(threshold=1, backoff=10, clock=clock)
+    breaker.record_failure()
+    _advance(clock, 10)
+    assert breaker.allow()
+    breaker.record_success()
+    assert not breaker.is_open
+    assert breaker.allow()
+    assert breaker.retry_in() == 0
@@ -0,0 +1,71 @@
+"""Tests for the adaptive forced refresh interval."""
+import datetime
+
+from custom_components.climote.refresh_schedule import RefreshSchedule
+from custom_components.climote.status import HubStatus, ZoneStatus
+
+HOUR = 3600
+_NOW = datetime.datetime(2024, 1, 1, 12, 0)
+_IDLE = HubStatus(zones={1: ZoneStatus(1)})
+_HEATING = HubStatus(zones={1: ZoneStatus(1, heating=True)})
+
+
+def _schedule(**kwargs):
+    kwargs.setdefault("min_interval", HOUR)
+    kwargs.setdefault("max_interval", 48 * HOUR)
+    return RefreshSchedule(12 * HOUR, **kwargs)
+
+
+def test_active_hub_gets_the_minimum():
+    schedule = _schedule()
+    assert schedule.current_interval(_HEATING, None, _NOW) == HOUR
+    recently = _NOW - datetime.timedelta(minutes=10)
+    assert schedule.current_interval(_IDLE, recently, _NOW) == HOUR
+    long_ago = _NOW - datetime.timedelta(hours=2)
+    assert schedule.current_interval(_IDLE, long_ago, _NOW) == 12 * HOUR
+
+
+def test_idle_refreshes_stretch_the_interval_to_the_maximum():
+    schedule = _schedule()
+    intervals = []
+    for _ in range(6):
+        intervals.append(schedule.current_interval(_IDLE, None, _NOW) / HOUR)
+        schedule.record(_NOW, active=False)
+    assert intervals == [12, 18, 27, 40.5, 48, 48]
+
+
+def test_activity_resets_the_stretch():
+    schedule = _schedule()
+    schedule.record(_NOW, active=False)
+    schedule.record(_NOW, active=False)
+    schedule.record(_NOW, active=None)
+    assert schedule.idle_streak == 2
+    schedule.observe(_HEATING, None, _NOW)
+    assert schedule.current_interval(_IDLE, None, _NOW) == 12 * HOUR
+
+
+def test_interval_stays_within_the_bounds():
+    assert _schedule(max_interval=6 * HOUR).current_interval(_IDLE, None, _NOW) == (
+        6 * HOUR
+    )
+    schedule = RefreshSchedule(HOUR / 2, min_interval=HOUR)
+    assert schedule.current_interval(_IDLE, None, _NOW) == HOUR
+
+
+def test_due():
+    schedule = _schedule()
+    assert schedule.due(None, _IDLE, None, _NOW)
+    assert not schedule.due(11 * HOUR, _IDLE, None, _NOW)
+    assert schedule.due(12 * HOUR, _IDLE, None, _NOW)
+    assert schedule.due(HOUR, _HEATING, None, _NOW)
+
+
+def test_daily_cap():
+    schedule = _schedule(daily_cap=3)
+    for hour in range(3):
+        schedule.record(_NOW + datetime.timedelta(hours=hour), active=True)
+    later = _NOW + datetime.timedelta(hours=23)
+    assert schedule.capped(later)
+    assert not schedule.due(HOUR, _HEATING, None, later)
+    # The first one drops out of the day
+    assert not schedule.capped(_NOW + datetime.timedelta(hours=24))
@@ -0,0 +1,53 @@
+"""Tests for the heating schedule model."""
+import datetime
+
+from custom_components.climote.schedule import HeatingSchedule, parse_schedule
+
+_DAY = (
+    "<day><period><start>06:30</start><end>08:30</end></period>"
+    "<period><start>22:00</start><end>01:00</end></period></day>"
+)
+_XML = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    "<schedule><zoneInfo>"
+    "<zone><active>1</active><label>Living</label></zone>"
+    "<zone><active>0</active><label>Spare</label></zone>"
+    "<zone><active>1</active><label>Water</label></zone>"
+    f"</zoneInfo><zone>{_DAY * 7}</zone><zone>{_DAY * 7}</zone></schedule>"
+).encode()
+
+
+def test_active_zones():
+    assert parse_schedule(_XML).active_zones() == {1: "Living", 3: "Water"}
+
+
+def test_zone_without_a_programme():
+    schedule = parse_schedule(_XML)
+    assert len(schedule.zone(1).days) == 7
+    assert schedule.zone(3).days == ()
+    assert schedule.zone(4) is None
+
+
+def test_period_active_at():
+    schedule = parse_schedule(_XML)
+    # A Monday
+    monday = datetime.datetime(2024, 1, 1)
+    assert schedule.period_active_at(1, monday.replace(hour=7)).start == (
+        datetime.time(6, 30)
+    )
+    assert schedule.period_active_at(1, monday.replace(hour=12)) is None
+    assert schedule.period_active_at(3, monday.replace(hour=7)) is None
+
+
+def test_overnight_period_carries_over():
+    schedule = parse_schedule(_XML)
+    # Sunday's 22:00 to 01:00 reaches into Monday
+    monday = datetime.datetime(2024, 1, 1, 0, 30)
+    period = schedule.period_active_at(1, monday)
+    assert period.overnight
+    assert period.start == datetime.time(22)
+
+
+def test_dict_round_trip():
+    schedule = parse_schedule(_XML)
+    assert HeatingSchedule.from_dict(schedule.as_dict()) == schedule
@@ -0,0 +1,93 @@
+"""A week of one hub on simulated time, refreshes, boosts and all.
+
+Runs benchmarks/bench_simulated_week.py, which follows the same forced
+refresh decision as the coordinator.
+"""
+import asyncio
+import datetime
+
+import pytest
+
+from benchmarks.bench_simulated_week import CLOUD_INTERVAL, WEEK, simulate_week
+from custom_components.climote.refresh_schedule import DEFAULT_DAILY_REFRESH_CAP
+
+_DAY = datetime.timedelta(days=1)
+_HOUR = datetime.timedelta(hours=1)
+_BOOST = datetime.timedelta(hours=1)
+
+
+@pytest.fixture(scope="module")
+def week():
+    return asyncio.run(simulate_week())
+
+
+@pytest.fixture(scope="module")
+def idle_week():
+    return asyncio.run(simulate_week(refresh_hours=24, boost_at=None))
+
+
+def _gaps(times):
+    return [later - earlier for earlier, later in zip(times, times[1:])]
+
+
+def test_every_refresh_succeeds(week):
+    assert week.failed == 0
+    # One refresh every cloud interval, give or take the time they take
+    assert len(week.forced) + week.cloud >= WEEK // CLOUD_INTERVAL * 0.99
+
+
+def test_forced_refreshes_stay_under_the_daily_cap(week):
+    for start in week.forced:
+        assert (
+            sum(start <= other < start + _DAY for other in week.forced)
+            <= DEFAULT_DAILY_REFRESH_CAP
+        )
+
+
+def test_boosting_hub_is_checked_on_within_the_minimum_interval(week):
+    assert len(week.boosts) == 7
+    slack = datetime.timedelta(seconds=2 * CLOUD_INTERVAL)
+    for boost in week.boosts:
+        assert any(boost < forced <= boost + _HOUR + slack for forced in week.forced)
+
+
+def test_boost_counts_down_a_minute_at_a_time(week):
+    for boost in week.boosts:
+        values = [
+            value
+            for when, value in week.countdown
+            if boost <= when < boost + _BOOST + 2 * _HOUR and value is not None
+        ]
+        assert values[0] >= 55
+        assert values[-1] == 1
+        assert all(0 <= a - b <= 1 for a, b in zip(values, values[1:]))
+
+
+def test_boost_ends_on_time(week):
+    for boost in week.boosts:
+        last = max(
+            when
+            for when, value in week.countdown
+            if boost <= when < boost + 2 * _BOOST and value is not None
+        )
+        assert abs(last - (boost + _BOOST)) < datetime.timedelta(minutes=3)
+
+
+def test_idle_hub_is_still_refreshed_after_a_day(idle_week):
+    assert idle_week.failed == 0
+    assert len(idle_week.forced) >= 4
+    slack = datetime.timedelta(seconds=2 * CLOUD_INTERVAL)
+    for gap in _gaps(idle_week.forced):
+        assert _DAY <= gap <= 2 * _DAY + slack
+
+
+def test_idle_hub_is_refreshed_at_the_maximum_interval():
+    idle_week = asyncio.run(
+        simulate_week(refresh_hours=12, boost_at=None, max_refresh_interval=24)
+    )
+    gaps = _gaps(idle_week.forced)
+    # 12 hours stretched to 18, then held at the 24 hour maximum
+    assert len(gaps) >= 5
+    slack = datetime.timedelta(seconds=2 * CLOUD_INTERVAL)
+    assert all(gap <= _DAY + slack for gap in gaps)
+    assert all(abs(gap - _DAY) <= slack for gap in gaps[2:])
@@ -0,0 +1,84 @@
+"""Tests for decoding the hub status."""
+import datetime
+
+from custom_components.climote.status import parse_status, place_time
+
+_DATA = {
+    "holiday": "00",
+    "hold": None,
+    "updated_at": "18:05",
+    "unit_time": "18:03",
+    "zone1": {
+        "burner": 1,
+        "status": "5",
+        "temperature": "19",
+        "thermostat": 21,
+        "timeRemaining": "42",
+    },
+    "zone2": {
+        "burner": 0,
+        "status": None,
+        "temperature": "--",
+        "thermostat": 20,
+        "timeRemaining": 0,
+    },
+}
+
+
+def test_parse_status():
+    status = parse_status(_DATA)
+    zone = status.zone(1)
+    assert zone.heating and zone.burner
+    assert (zone.temperature, zone.thermostat, zone.time_remaining) == (19, 21, 42)
+    assert status.updated_at == datetime.time(18, 5)
+    assert status.unit_time == datetime.time(18, 3)
+
+
+def test_missing_readings():
+    zone = parse_status(_DATA).zone(2)
+    assert not zone.heating
+    assert zone.temperature == 0
+    assert zone.time_remaining is None
+    assert parse_status({"updated_at": "--"}).updated_at is None
+
+
+def test_unknown_zone_is_off():
+    zone = parse_status(_DATA).zone(3)
+    assert zone.zone_id == 3
+    assert not zone.heating
+
+
+def test_with_zone_leaves_the_original():
+    status = parse_status(_DATA)
+    changed = status.with_zone(2, thermostat=25)
+    assert changed.zone(2).thermostat == 25
+    assert status.zone(2).thermostat == 20
+    assert changed.zone(1) == status.zone(1)
+
+
+def test_unit_offset():
+    # unit_time 18:03 against updated_at 18:05
+    assert parse_status(_DATA).unit_offset() == -2
+    midnight = parse_status({"updated_at": "23:58", "unit_time": "00:01"})
+    assert midnight.unit_offset() == 3
+    assert parse_status({"updated_at": "18:05"}).unit_offset() == 0
+
+
+def test_place_time_same_day():
+    now = datetime.datetime(2024, 1, 2, 12, 0)
+    assert place_time(datetime.time(11, 58), now) == datetime.datetime(
+        2024, 1, 2, 11, 58
+    )
+    # A little ahead of now, the clock that wrote it runs fast
+    assert place_time(datetime.time(12, 3), now) == datetime.datetime(2024, 1, 2, 12, 3)
+
+
+def test_place_time_across_midnight():
+    just_after = datetime.datetime(2024, 1, 2, 0, 2)
+    assert place_time(datetime.time(23, 58), just_after) == datetime.datetime(
+        2024, 1, 1, 23, 58
+    )
+    just_before = datetime.datetime(2024, 1, 1, 23, 58)
+    assert place_time(datetime.time(0, 2), just_before) == datetime.datetime(
+        2024, 1, 2, 0, 2
+    )